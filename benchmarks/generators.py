@@ -0,0 +1,67 @@
+"""Synthetic survey intervals and FOU codebooks for the benchmarks."""
+
+import numpy as np
+
+from eia.config import DEFAULT_CONFIG
+
+
+def survey_intervals(n, seed=0, shape="interior", config=DEFAULT_CONFIG):
+    """(n, 2) array of survey intervals for one word
+
+    Most intervals are centered on a word-specific location, with a few bad
+    and outlying answers mixed in, like real survey exports.
+    """
+
+    rng = np.random.default_rng(seed)
+    center = {"left-shoulder": 1.0, "interior": 5.0, "right-shoulder": 9.0}[shape]
+    middle = rng.normal(center, 0.8, n)
+    length = np.abs(rng.normal(2.0, 0.6, n))
+    left = np.clip(middle - length / 2, config.lower, config.upper)
+    right = np.clip(middle + length / 2, config.lower, config.upper)
+
+    # about 2% of bad data: reversed intervals and out of range answers
+    bad = rng.random(n) < 0.02
+    left[bad], right[bad] = right[bad] + 0.5, left[bad]
+    return np.column_stack([left, right]).round(3)
+
+
+def survey_words(n_words, n_intervals, seed=0):
+    """Dictionary of survey intervals for n_words words"""
+
+    shapes = ["left-shoulder", "interior", "right-shoulder"]
+    return {
+        f"word{i}": survey_intervals(n_intervals, seed + i, shapes[i % 3]).tolist()
+        for i in range(n_words)
+    }
+
+
+def codebook(n_words, seed=0, config=DEFAULT_CONFIG):
+    """(n_words, 9) array of valid IT2 FSs in the [a, b, c, d, e, f, g, i, h] layout"""
+
+    rng = np.random.default_rng(seed)
+    a, b, c, d = np.sort(rng.uniform(config.lower, config.upper, (4, n_words)), axis=0)
+    e = rng.uniform(a, b)
+    i = rng.uniform(c, d)
+    f, g = np.sort(rng.uniform(e, i, (2, n_words)), axis=0)
+    h = rng.uniform(0.2, 1, n_words)
+
+    # a third of the words are shoulders
+    left = rng.random(n_words) < 1 / 6
+    right = ~left & (rng.random(n_words) < 1 / 5)
+    a[left] = b[left] = e[left] = f[left] = config.lower
+    c[right] = d[right] = g[right] = i[right] = config.upper
+    h[left | right] = 1
+    return np.column_stack([a, b, c, d, e, f, g, i, h])
+
+
+def words_status(n_words, seed=0):
+    """Words status dictionary of n_words random IT2 FSs, like the output of
+    process_fuzzy_set_part without the embedded T1 FSs"""
+
+    shapes = ["left-shoulder", "interior", "right-shoulder"]
+    mfs = codebook(n_words, seed)
+    status = {}
+    for k, mf in enumerate(mfs.tolist()):
+        shape = 0 if mf[0] == mf[1] else 2 if mf[2] == mf[3] else 1
+        status[f"word{k}"] = {"shape": shapes[shape], "MF": [mf[4:], mf[:4]]}
+    return status
@@ -0,0 +1,452 @@
+"""Throughput and peak memory of the hot paths in eia and utils
+
+Usage:
+    python -m benchmarks.run [--suite quick|default|full] [--filter TEXT]
+                             [--output results.json] [--baseline baseline.json]
+                             [--threshold 0.2] [--min-time 0.2]
+
+Every benchmark runs its function on synthetic data at several scales and
+reports the best time of one call, the throughput in items per second (the
+unit is given with each benchmark) and the peak memory allocated during one
+call, as traced by tracemalloc. The results can be saved as JSON and compared
+against a saved baseline; the exit status is 1 if any benchmark got slower by
+more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks import generators
+from eia.bootstrap import run_bootstrap
+from eia.data_part import data_part, data_part_array
+from eia.fuzzy_set_part import (
+    embedded_t1fs,
+    fuzzy_part,
+    fuzzy_part_batch,
+    min_intersection_height,
+)
+from eia.incremental import WordEncoder
+from eia.parallel import run_eia
+from utils.centroid_it2fs import (
+    centroid_it2,
+    centroid_it2_batch,
+    centroid_it2_exact,
+    ekm,
+    ekm_batch,
+    mg,
+    mg_array,
+)
+from utils.codebook import Codebook, write_codebook
+from utils.linguistic_weighted_average import lwa, lwa_batch
+from utils.ranking_methods import Ranker
+from utils.similarity_measures import JaccardIndex, jaccard, jaccard_matrix
+
+# sizes of the synthetic surveys and codebooks
+SCALES = {
+    "intervals": [10**2, 10**3, 10**4, 10**5, 10**6],
+    "words": [10**1, 10**2, 10**3, 10**4],
+    "startup": [1],
+}
+
+# largest size of each unit run by the suites
+SUITES = {
+    "quick": {"intervals": 10**3, "words": 10**2, "startup": 1},
+    "default": {"intervals": 10**5, "words": 10**3, "startup": 1},
+    "full": {"intervals": 10**6, "words": 10**4, "startup": 1},
+}
+
+BENCHMARKS = {}
+
+
+def benchmark(name, unit, scale, max_size=None):
+    """Registering a benchmark
+
+    unit: the items counted for the throughput
+    scale: "intervals" or "words", the sizes the benchmark is run at
+    max_size: largest size, for functions that would take too long beyond it
+
+    The decorated function builds the data for one size and returns the
+    function to time, without arguments, and the number of items it processes.
+    """
+
+    sizes = [size for size in SCALES[scale] if max_size is None or size <= max_size]
+
+    def register(setup):
+        BENCHMARKS[name] = (unit, scale, sizes, setup)
+        return setup
+
+    return register
+
+
+def _mfs(n):
+    return generators.codebook(n)
+
+
+def _nested(mfs):
+    return [[mf[4:], mf[:4]] for mf in mfs.tolist()]
+
+
+@benchmark("eia.data_part", "intervals", "intervals")
+def _(n):
+    intervals = generators.survey_intervals(n).tolist()
+    return lambda: data_part(intervals), n
+
+
+@benchmark("eia.data_part_array", "intervals", "intervals")
+def _(n):
+    intervals = generators.survey_intervals(n)
+    return lambda: data_part_array(intervals), n
+
+
+@benchmark("eia.fuzzy_part", "intervals", "intervals", 10**4)
+def _(n):
+    intervals = data_part_array(generators.survey_intervals(n))
+    return lambda: fuzzy_part(intervals), n
+
+
+def _survey(n_words):
+    words = [data_part_array(v) for v in generators.survey_words(n_words, 100).values()]
+    words = [intervals for intervals in words if len(intervals)]
+    offsets = np.concatenate([[0], np.cumsum([len(v) for v in words])])
+    return words, np.concatenate(words), offsets
+
+
+@benchmark("eia.fuzzy_part.words", "words", "words", 10**3)
+def _(n):
+    words, _, _ = _survey(n)
+    return lambda: [fuzzy_part(intervals) for intervals in words], n
+
+
+@benchmark("eia.fuzzy_part_batch", "words", "words")
+def _(n):
+    _, intervals, offsets = _survey(n)
+    return lambda: fuzzy_part_batch(intervals, offsets), n
+
+
+@benchmark("eia.min_intersection_height", "intervals", "intervals", 10**4)
+def _(n):
+    intervals = generators.survey_intervals(n)
+    valid = intervals[:, 0] < intervals[:, 1]
+    fsl, fsr, admissible = embedded_t1fs(*intervals[valid].T, "interior")
+    fsl, fsr = fsl[admissible], fsr[admissible]
+    fsc = (fsl + fsr) / 2
+    return lambda: min_intersection_height(fsl, fsr, fsc), n
+
+
+@benchmark("eia.WordEncoder", "intervals", "intervals", 10**4)
+def _(n):
+    intervals = data_part_array(generators.survey_intervals(n))
+    half = len(intervals) // 2
+
+    def encode():
+        encoder = WordEncoder(intervals[:half])
+        encoder.status
+        for interval in intervals[half:]:
+            encoder.add(interval)
+        encoder.status
+
+    return encode, n
+
+
+@benchmark("eia.run_eia", "words", "words", 10**3)
+def _(n):
+    words = generators.survey_words(n, 100)
+    return lambda: run_eia(words, workers=0), n
+
+
+@benchmark("eia.run_bootstrap", "replicates", "words", 10**2)
+def _(n):
+    words = generators.survey_words(10, 100)
+    return lambda: run_bootstrap(words, n, seed=0, workers=0), 10 * n
+
+
+@benchmark("utils.mg", "points", "intervals", 10**5)
+def _(n):
+    x = np.linspace(0, 10, n).tolist()
+    return lambda: mg(x, [1, 3, 6, 9]), n
+
+
+@benchmark("utils.mg_array", "points", "intervals")
+def _(n):
+    x = np.linspace(0, 10, n)
+    return lambda: mg_array(x, [1, 3, 6, 9]), n
+
+
+@benchmark("utils.ekm", "points", "intervals", 10**4)
+def _(n):
+    x = np.linspace(0, 10, n)
+    lower = mg_array(x, [2, 4, 5, 8], [0, 0.6, 0.6, 0])
+    upper = mg_array(x, [1, 3, 6, 9])
+    return lambda: ekm(x.tolist(), lower.tolist(), upper.tolist(), 1), n
+
+
+@benchmark("utils.ekm_batch", "problems", "words")
+def _(n):
+    mfs = _mfs(n)
+    x = np.linspace(mfs[:, 0], mfs[:, 3], 100, axis=-1)
+    lower = mg_array(
+        x,
+        mfs[:, 4:8],
+        np.column_stack([0 * mfs[:, 8], mfs[:, 8], mfs[:, 8], 0 * mfs[:, 8]]),
+    )
+    upper = mg_array(x, mfs[:, :4])
+    return lambda: ekm_batch(x, lower, upper, 1), n
+
+
+@benchmark("utils.centroid_it2", "words", "words", 10**3)
+def _(n):
+    fous = _nested(_mfs(n))
+    return lambda: [centroid_it2(fou) for fou in fous], n
+
+
+@benchmark("utils.centroid_it2_batch", "words", "words")
+def _(n):
+    mfs = _mfs(n)
+    return lambda: centroid_it2_batch(mfs), n
+
+
+@benchmark("utils.centroid_it2_exact", "words", "words")
+def _(n):
+    mfs = _mfs(n)
+    return lambda: centroid_it2_exact(mfs), n
+
+
+@benchmark("utils.jaccard", "pairs", "words", 10**3)
+def _(n):
+    mfs = _mfs(n + 1).tolist()
+    return lambda: [jaccard(a, b) for a, b in zip(mfs, mfs[1:])], n
+
+
+@benchmark("utils.jaccard_matrix", "pairs", "words", 10**3)
+def _(n):
+    mfs = _mfs(n)
+    return lambda: jaccard_matrix(mfs), n * n
+
+
+@benchmark("utils.JaccardIndex.query", "queries", "words")
+def _(n):
+    mfs = _mfs(n)
+    index = JaccardIndex([f"word{k}" for k in range(n)], mfs)
+    queries = generators.codebook(10, seed=1)
+    return lambda: [index.query(fou, k=5) for fou in queries], len(queries)
+
+
+@benchmark("utils.lwa", "alternatives", "words", 10**3)
+def _(n):
+    x = _mfs(5 * n).reshape(n, 5, 9).tolist()
+    w = _mfs(5).tolist()
+    return lambda: [lwa(alternative, w) for alternative in x], n
+
+
+@benchmark("utils.lwa_batch", "alternatives", "words")
+def _(n):
+    x = _mfs(5 * n).reshape(n, 5, 9)
+    w = _mfs(5)
+    return lambda: lwa_batch(x, w), n
+
+
+@benchmark("utils.Ranker.rank", "words", "words")
+def _(n):
+    mfs = _mfs(n)
+    return lambda: Ranker().rank(mfs), n
+
+
+@benchmark("utils.Codebook", "lookups", "words")
+def _(n):
+    status = generators.words_status(n)
+    directory = tempfile.TemporaryDirectory()
+    path = os.path.join(directory.name, "codebook.bin")
+    write_codebook(status, path)
+    words = list(status)
+
+    # the default argument keeps the directory alive as long as the benchmark
+    def lookup(directory=directory):
+        codebook = Codebook(path)
+        return [codebook.mf(word) for word in words]
+
+    return lookup, n
+
+
+# The startup benchmarks time new interpreters, from their start to their exit,
+# run from the root of the repository
+
+root = Path(__file__).resolve().parent.parent
+
+
+def _python(*args, stdin=None):
+    def run():
+        subprocess.run(
+            [sys.executable, *args],
+            input=stdin,
+            stdout=subprocess.DEVNULL,
+            cwd=root,
+            check=True,
+        )
+
+    return run
+
+
+@benchmark("startup.python", "runs", "startup")
+def _(n):
+    return _python("-c", "pass"), n
+
+
+@benchmark("startup.import_eia", "runs", "startup")
+def _(n):
+    return _python("-c", "import eia"), n
+
+
+@benchmark("startup.import_eia_parallel", "runs", "startup")
+def _(n):
+    return _python("-c", "import eia.parallel"), n
+
+
+@benchmark("startup.import_utils_service", "runs", "startup")
+def _(n):
+    return _python("-c", "import utils.service"), n
+
+
+@benchmark("startup.encode_json", "words", "words", 10**2)
+def _(n):
+    words = generators.survey_words(n, 100)
+    return _python("-m", "eia", stdin=json.dumps(words).encode()), n
+
+
+def measure(function, min_time=0.2, max_repeat=100):
+    """Best time of one call, repeated until min_time has passed, and the peak
+    memory traced during one more call"""
+
+    times = []
+    while len(times) < max_repeat and (not times or sum(times) < min_time):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+
+def run_benchmarks(suite="default", pattern=None, min_time=0.2, log=None):
+    """Running the benchmarks of a suite; returns a list of results
+
+    pattern: only run the benchmarks whose name contains it
+    log: called with a formatted line for each result
+    """
+
+    limits = SUITES[suite]
+    results = []
+    for name, (unit, scale, sizes, setup) in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        for size in sizes:
+            if size > limits[scale]:
+                continue
+            function, ops = setup(size)
+            seconds, peak = measure(function, min_time)
+            result = {
+                "name": name,
+                "unit": unit,
+                "size": size,
+                "seconds": seconds,
+                "ops_per_sec": ops / seconds if seconds else float("inf"),
+                "peak_memory": peak,
+            }
+            results.append(result)
+            if log:
+                log(format_result(result))
+    return results
+
+
+def format_result(result):
+    return (
+        f"{result['name']:<32} {result['size']:>8} {result['unit']:<13}"
+        f" {result['seconds'] * 1e3:>12.3f} ms {result['ops_per_sec']:>14.1f} /s"
+        f" {result['peak_memory'] / 2**20:>10.2f} MiB"
+    )
+
+
+def metadata():
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold=0.2):
+    """Comparing results with a baseline from an earlier run
+
+    Returns one row per benchmark found in both, with the ratio of the current
+    throughput to the baseline one and whether it is a regression, i.e. a ratio
+    below 1 - threshold.
+    """
+
+    previous = {(r["name"], r["size"]): r for r in baseline["results"]}
+    rows = []
+    for result in results:
+        before = previous.get((result["name"], result["size"]))
+        if before is None:
+            continue
+        ratio = result["ops_per_sec"] / before["ops_per_sec"]
+        rows.append(
+            {
+                "name": result["name"],
+                "size": result["size"],
+                "baseline": before["ops_per_sec"],
+                "current": result["ops_per_sec"],
+                "ratio": ratio,
+                "regression": ratio < 1 - threshold,
+            }
+        )
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", choices=SUITES, default="default")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--output", help="JSON file to save the results to")
+    parser.add_argument(
+        "--baseline", help="JSON file of an earlier run to compare with"
+    )
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.suite, args.filter, args.min_time, log=print)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"meta": metadata(), "results": results}, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            rows = compare(results, json.load(file), args.threshold)
+        print()
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:<32} {row['size']:>8} {row['ratio']:>8.2f}x{flag}")
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""Enhanced Interval Approach (EIA) for encoding words into IT2 FSs
+
+The names below are imported from their modules on first access, so that
+`import eia` does not load NumPy, and openpyxl is only imported by the
+functions that read Excel files. The data_part function is left out because
+it shares its name with the eia.data_part module; import it from there.
+"""
+
+import importlib
+
+_exports = {
+    "EIAConfig": "eia.config",
+    "DEFAULT_CONFIG": "eia.config",
+    "data_part_array": "eia.data_part",
+    "data_part_indices": "eia.data_part",
+    "process_data_part": "eia.data_part",
+    "iter_excel_words": "eia.data_part",
+    "iter_csv_words": "eia.data_part",
+    "stream_data_part": "eia.data_part",
+    "SHAPES": "eia.fuzzy_set_part",
+    "fuzzy_part": "eia.fuzzy_set_part",
+    "fuzzy_part_batch": "eia.fuzzy_set_part",
+    "process_fuzzy_set_part": "eia.fuzzy_set_part",
+    "WordEncoder": "eia.incremental",
+    "encode_word": "eia.parallel",
+    "run_eia": "eia.parallel",
+    "bootstrap_word": "eia.bootstrap",
+    "run_bootstrap": "eia.bootstrap",
+    "Profile": "utils.profiling",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_exports})
@@ -0,0 +1,168 @@
+from functools import partial
+
+import numpy as np
+
+from eia.config import DEFAULT_CONFIG
+from eia.data_part import data_part_array
+from eia.fuzzy_set_part import SHAPES, fuzzy_part_batch
+
+
+def bootstrap_replicates(intervals, replicates=1000, seed=None, config=DEFAULT_CONFIG):
+    """FOUs of a word on bootstrap resamples of its respondents
+
+    intervals: survey intervals of the word, before the data part
+    replicates: number of resamples, each as large as the survey
+    seed: seed or np.random.SeedSequence of the resampling
+    config: an EIAConfig with the universe of discourse of the survey
+
+    Every resample goes through the four Data Part stages, and the FOUs of
+    all of them are then built at once by fuzzy_part_batch.
+
+    Returns the (replicates, 9) MFs [a, b, c, d, e, f, g, i, h] and the shape
+    codes indexing SHAPES. Resamples without an FOU, because no interval or no
+    embedded T1 FS survived, have an MF of NaNs and a shape code of -1; so do
+    all of them for a word without intervals, which has nothing to resample.
+    """
+
+    intervals = np.asarray(intervals, dtype=float).reshape(-1, 2)
+    mfs = np.full((replicates, 9), np.nan)
+    shapes = np.full(replicates, -1, dtype="i1")
+    if not len(intervals):
+        return mfs, shapes
+
+    rng = np.random.default_rng(seed)
+    samples = intervals[rng.integers(0, len(intervals), (replicates, len(intervals)))]
+
+    kept = [data_part_array(sample, config) for sample in samples]
+    counts = np.array([len(sample) for sample in kept])
+    encoded = np.flatnonzero(counts)
+
+    if encoded.size:
+        offsets = np.concatenate([[0], np.cumsum(counts[encoded])])
+        mfs[encoded], shapes[encoded], _, _ = fuzzy_part_batch(
+            np.concatenate([kept[k] for k in encoded]), offsets, config
+        )
+    shapes[np.isnan(mfs).any(axis=1)] = -1
+    return mfs, shapes
+
+
+def bootstrap_word(
+    intervals,
+    replicates=1000,
+    seed=None,
+    quantiles=(0.025, 0.5, 0.975),
+    config=DEFAULT_CONFIG,
+):
+    """Bootstrap confidence bands of the FOU of a word
+
+    intervals: survey intervals of the word, before the data part
+    replicates: number of resamples of the respondents
+    seed: seed or np.random.SeedSequence of the resampling
+    quantiles: quantiles of the MF parameters to report
+    config: an EIAConfig with the universe of discourse of the survey
+
+    A word without intervals, before or after the data part, has no FOU to
+    resample: its shape is None, no resample is valid and the bands are NaNs.
+
+    Returns a dictionary with
+    shape: the shape of the word encoded on the whole survey, or None
+    replicates, valid: the number of resamples, and of those with an FOU
+    shapes: the fraction of the valid resamples classified as each shape
+    stability: the fraction of the valid resamples with the shape of the word
+    quantiles: the quantiles, and MF: for each of them, the quantiles of the
+        parameters in the layout of the words status, [LMF, UMF]
+    """
+
+    mfs, shapes = bootstrap_replicates(intervals, replicates, seed, config)
+    valid = shapes >= 0
+
+    full = data_part_array(intervals, config)
+    shape = None
+    if len(full):
+        _, codes, _, admissible = fuzzy_part_batch(full, [0, len(full)], config)
+        shape = SHAPES[codes[0]] if admissible.any() else None
+
+    n_valid = int(np.count_nonzero(valid))
+    frequencies = np.bincount(shapes[valid], minlength=len(SHAPES)) / max(n_valid, 1)
+    bands = (
+        np.quantile(mfs[valid], quantiles, axis=0)
+        if n_valid
+        else np.full((len(quantiles), 9), np.nan)
+    )
+
+    return {
+        "shape": shape,
+        "replicates": replicates,
+        "valid": n_valid,
+        "shapes": dict(zip(SHAPES, frequencies.tolist())),
+        "stability": float(frequencies[SHAPES.index(shape)]) if shape else 0.0,
+        "quantiles": list(quantiles),
+        "MF": [[band[4:].tolist(), band[:4].tolist()] for band in bands],
+    }
+
+
+def _bootstrap_item(item, replicates, quantiles, config):
+    word, intervals, seed = item
+    try:
+        return (
+            word,
+            bootstrap_word(intervals, replicates, seed, quantiles, config),
+            None,
+        )
+    except Exception as error:
+        return word, None, f"{type(error).__name__}: {error}"
+
+
+def run_bootstrap(
+    words,
+    replicates=1000,
+    seed=None,
+    quantiles=(0.025, 0.5, 0.975),
+    workers=None,
+    chunksize=1,
+    config=DEFAULT_CONFIG,
+):
+    """Bootstrapping the FOUs of many words over a pool of processes
+
+    words: a dictionary or an iterable of (word, intervals) pairs
+    replicates, quantiles, config: as in bootstrap_word
+    seed: seed of the whole run; each word resamples from its own child of
+        np.random.SeedSequence(seed), so the results only depend on the seed
+        and the order of the words, not on the workers or chunk size
+    workers: number of worker processes, defaults to the number of CPUs;
+        0 runs everything in the current process
+    chunksize: number of words sent to a worker at a time
+
+    return values:
+    bands: the bootstrap_word result of each word, in the input order
+    errors: an error message for each word that failed
+    """
+
+    items = list(words.items() if isinstance(words, dict) else words)
+    seeds = np.random.SeedSequence(seed).spawn(len(items))
+    items = [(word, intervals, s) for (word, intervals), s in zip(items, seeds)]
+    run = partial(
+        _bootstrap_item, replicates=replicates, quantiles=quantiles, config=config
+    )
+
+    bands = {}
+    errors = {}
+    if workers == 0:
+        results = map(run, items)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(workers)
+        results = executor.map(run, items, chunksize=chunksize)
+
+    try:
+        for word, result, error in results:
+            if error is not None:
+                errors[word] = error
+            else:
+                bands[word] = result
+    finally:
+        if workers != 0:
+            executor.shutdown()
+
+    return bands, errors
@@ -0,0 +1,76 @@
+import warnings
+from collections import namedtuple
+
+
+# a named tuple rather than a dataclass, whose import (with inspect) would be a
+# noticeable part of the startup of short jobs
+class EIAConfig(namedtuple("EIAConfig", ["lower", "upper", "max_length"])):
+    """Universe of discourse of a survey and the constants derived from it
+
+    lower, upper: bounds of the universe of discourse
+    max_length: bound on the interval lengths used by the tolerance limit
+        processing, 10 times the width of the universe by default as in the
+        original code for [0, 10]
+
+    The shoulder tests of the Fuzzy Set Part were derived on [0, 10]; their
+    lines are mapped onto [lower, upper], so a survey on another scale gets
+    approximately the same FOUs as its normalized version, up to the same
+    scaling. Only approximately: the scaled values are rounded differently, so
+    an interval right on a fence of the Data Part may be kept on one scale and
+    dropped on the other. Configurations are immutable and picklable, so each
+    word or run can carry its own.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, lower=0, upper=10, max_length=None):
+        if not lower < upper:
+            raise ValueError(f"empty universe of discourse [{lower}, {upper}]")
+        return super().__new__(cls, lower, upper, max_length)
+
+    @property
+    def span(self):
+        return self.upper - self.lower
+
+    @property
+    def scale(self):
+        """Width of the universe relative to [0, 10]"""
+
+        return self.span / 10
+
+    @property
+    def length_limit(self):
+        return 10 * self.span if self.max_length is None else self.max_length
+
+    @property
+    def shoulder_intercept(self):
+        """Intercept of the right-shoulder line r = 0.171 l + 8.29 on [0, 10],
+        relative to lower"""
+
+        return 8.29 * self.scale
+
+    @property
+    def sigma_offset(self):
+        """Shift of sigma* from the mean of the intervals with no spread"""
+
+        return 0.01 * self.scale
+
+
+DEFAULT_CONFIG = EIAConfig()
+
+
+# the module globals of the original code, now read from DEFAULT_CONFIG
+_BOUNDS = {"lower_bound": "lower", "upper_bound": "upper"}
+
+
+def deprecated_bound(module, name):
+    """Module __getattr__ for the deprecated lower_bound and upper_bound"""
+
+    if name not in _BOUNDS:
+        raise AttributeError(f"module {module!r} has no attribute {name!r}")
+    warnings.warn(
+        f"{module}.{name} is deprecated, pass an EIAConfig instead",
+        DeprecationWarning,
+        stacklevel=3,
+    )
+    return getattr(DEFAULT_CONFIG, _BOUNDS[name])
@@ -1,18 +1,55 @@
+import csv
 import itertools
+import json
+from functools import partial
 
 import numpy as np
 
-lower_bound = 0
-upper_bound = 10
-
-
-def bad_data_processing(interval):
+from eia.config import DEFAULT_CONFIG, deprecated_bound
+from utils import profiling
+
+
+# the deprecated lower_bound and upper_bound globals, defined before main runs
+def __getattr__(name):
+    return deprecated_bound(__name__, name)
+
+
+_tolerance_limits = [
+    32.019,
+    32.019,
+    8.380,
+    5.369,
+    4.275,
+    3.712,
+    3.369,
+    3.136,
+    2.967,
+    2.839,
+    2.737,
+    2.655,
+    2.587,
+    2.529,
+    2.48,
+    2.437,
+    2.4,
+    2.366,
+    2.337,
+    2.31,
+    2.31,
+    2.31,
+    2.31,
+    2.31,
+    2.208,
+]
+
+
+def bad_data_processing(interval, config=DEFAULT_CONFIG):
     """Checking bad data intervals"""
 
     left = interval[0]
     right = interval[1]
 
-    if lower_bound <= left < right <= upper_bound and (right - left) < upper_bound:
+    if config.lower <= left < right <= config.upper and (right - left) < config.span:
         return True
     else:
         return False
@@ -58,7 +95,7 @@ def outlier_processing(intervals):
     return filtered_intervals
 
 
-def tolerance_limit_processing(intervals):
+def tolerance_limit_processing(intervals, config=DEFAULT_CONFIG):
     """Tolerance limit processing"""
 
     if not intervals:
@@ -71,34 +108,7 @@ def tolerance_limit_processing(intervals):
     mean_right = np.mean(right)
     std_right = np.std(right, ddof=1)
 
-    limits = [
-        32.019,
-        32.019,
-        8.380,
-        5.369,
-        4.275,
-        3.712,
-        3.369,
-        3.136,
-        2.967,
-        2.839,
-        2.737,
-        2.655,
-        2.587,
-        2.529,
-        2.48,
-        2.437,
-        2.4,
-        2.366,
-        2.337,
-        2.31,
-        2.31,
-        2.31,
-        2.31,
-        2.31,
-        2.208,
-    ]
-    k = limits[min(len(left), len(limits)) - 1]
+    k = _tolerance_limits[min(len(left), len(_tolerance_limits)) - 1]
 
     # Tolerance limit processing for Left and Right bounds
     left_filtered = [
@@ -118,7 +128,7 @@ def tolerance_limit_processing(intervals):
     std_len = np.std(len_values, ddof=1)
 
     if std_len != 0:
-        k = min(k, mean_len / std_len, (100 - mean_len) / std_len)
+        k = min(k, mean_len / std_len, (config.length_limit - mean_len) / std_len)
 
     len_filtered = [
         x if (mean_len - k * std_len) <= x <= (mean_len + k * std_len) else None
@@ -129,26 +139,15 @@ def tolerance_limit_processing(intervals):
     return filtered_intervals
 
 
-def reasonable_interval_processing(intervals):
-    """Reasonable interval processing"""
-
-    if not intervals:
-        return []
-
-    left = [x[0] for x in intervals]
-    right = [x[1] for x in intervals]
-    mean_left = np.mean(left)
-    std_left = np.std(left, ddof=1)
-    mean_right = np.mean(right)
-    std_right = np.std(right, ddof=1)
+def _sigma_star(mean_left, std_left, mean_right, std_right, offset=0.01):
+    """Determining sigma*"""
 
-    # Determining sigma*
     if std_left == std_right:
         sigma_star = (mean_left + mean_right) / 2
     elif std_left == 0:
-        sigma_star = mean_left + 0.01
+        sigma_star = mean_left + offset
     elif std_right == 0:
-        sigma_star = mean_right - 0.01
+        sigma_star = mean_right - offset
     else:
         sigma1 = (
             mean_right * std_left**2
@@ -177,6 +176,26 @@ def reasonable_interval_processing(intervals):
         else:
             sigma_star = sigma2
 
+    return sigma_star
+
+
+def reasonable_interval_processing(intervals, config=DEFAULT_CONFIG):
+    """Reasonable interval processing"""
+
+    if not intervals:
+        return []
+
+    left = [x[0] for x in intervals]
+    right = [x[1] for x in intervals]
+    mean_left = np.mean(left)
+    std_left = np.std(left, ddof=1)
+    mean_right = np.mean(right)
+    std_right = np.std(right, ddof=1)
+
+    sigma_star = _sigma_star(
+        mean_left, std_left, mean_right, std_right, config.sigma_offset
+    )
+
     # Checking reasonable intervals
     reasonable_intervals = [
         x
@@ -190,9 +209,185 @@ def reasonable_interval_processing(intervals):
     return reasonable_intervals
 
 
-def process_data_part(excel_workbook):
-    import json
+def _bad_data_filter(intervals, config=DEFAULT_CONFIG):
+    return [x for x in intervals if bad_data_processing(x, config)]
+
+
+def data_part(intervals, config=DEFAULT_CONFIG):
+    """Doing the data part for each word
+
+    config: an EIAConfig with the universe of discourse of the survey
+    """
+
+    intervals = list(intervals)
+    intervals = profiling.filter_stage(
+        "data_part.bad_data", partial(_bad_data_filter, config=config), intervals
+    )
+    intervals = profiling.filter_stage(
+        "data_part.outliers", outlier_processing, intervals
+    )
+    intervals = profiling.filter_stage(
+        "data_part.tolerance_limits",
+        partial(tolerance_limit_processing, config=config),
+        intervals,
+    )
+    intervals = profiling.filter_stage(
+        "data_part.reasonable_intervals",
+        partial(reasonable_interval_processing, config=config),
+        intervals,
+    )
+    return intervals
+
+
+def data_part_array(intervals, config=DEFAULT_CONFIG):
+    """Doing the data part for each word on an (n, 2) array of intervals
+
+    All four stages work on boolean masks over the same arrays, and the
+    surviving intervals are identical to the ones kept by data_part.
+    config: an EIAConfig with the universe of discourse of the survey
+    """
+
+    intervals = np.asarray(intervals, dtype=float).reshape(-1, 2)
+    return intervals[data_part_indices(intervals, config)]
+
+
+def data_part_indices(intervals, config=DEFAULT_CONFIG, fences=None):
+    """Indices of the rows of an (n, 2) array of intervals kept by the Data Part
 
+    config: an EIAConfig with the universe of discourse of the survey
+    fences: optional list, to which every comparison of the outlier, tolerance
+        limit and reasonable interval stages appends the indices of the
+        intervals it compares, their compared values and its two fences
+    """
+
+    left = intervals[:, 0].copy()
+    right = intervals[:, 1].copy()
+
+    indices = profiling.filter_stage(
+        "data_part.bad_data",
+        partial(_bad_data_mask, config=config),
+        left,
+        right,
+        np.arange(len(intervals)),
+    )
+    for name, stage in _array_stages:
+        if not indices.size:
+            break
+        stage = partial(stage, config=config, fences=fences)
+        indices = profiling.filter_stage(name, stage, left, right, indices)
+
+    return indices
+
+
+def _filter(indices, values, low, high, fences=None):
+    """The indices whose values are within [low, high]"""
+
+    if fences is not None:
+        fences.append((indices, values, low, high))
+    return indices[(low <= values) & (values <= high)]
+
+
+def _bad_data_mask(left, right, indices, config=DEFAULT_CONFIG):
+    """Bad data processing on the intervals at indices"""
+
+    l = left[indices]
+    r = right[indices]
+    return indices[
+        (config.lower <= l) & (l < r) & (r <= config.upper) & ((r - l) < config.span)
+    ]
+
+
+def _outlier_mask(left, right, indices, config=DEFAULT_CONFIG, fences=None):
+    """Outlier processing on the intervals at indices"""
+
+    lq25, lq75 = np.percentile(left[indices], [25, 75])
+    liqr = lq75 - lq25
+    rq25, rq75 = np.percentile(right[indices], [25, 75])
+    riqr = rq75 - rq25
+
+    indices = _filter(
+        indices, left[indices], lq25 - 1.5 * liqr, lq75 + 1.5 * liqr, fences
+    )
+    indices = _filter(
+        indices, right[indices], rq25 - 1.5 * riqr, rq75 + 1.5 * riqr, fences
+    )
+
+    len_values = right[indices] - left[indices]
+    lenq25, lenq75 = np.percentile(len_values, [25, 75])
+    leniqr = lenq75 - lenq25
+    return _filter(
+        indices, len_values, lenq25 - 1.5 * leniqr, lenq75 + 1.5 * leniqr, fences
+    )
+
+
+def _tolerance_limit_mask(left, right, indices, config=DEFAULT_CONFIG, fences=None):
+    """Tolerance limit processing on the intervals at indices"""
+
+    l = left[indices]
+    r = right[indices]
+    mean_left = np.mean(l)
+    std_left = np.std(l, ddof=1)
+    mean_right = np.mean(r)
+    std_right = np.std(r, ddof=1)
+    k = _tolerance_limits[min(len(l), len(_tolerance_limits)) - 1]
+
+    indices = _filter(
+        indices, l, mean_left - k * std_left, mean_left + k * std_left, fences
+    )
+    indices = _filter(
+        indices,
+        right[indices],
+        mean_right - k * std_right,
+        mean_right + k * std_right,
+        fences,
+    )
+
+    len_values = right[indices] - left[indices]
+    mean_len = np.mean(len_values)
+    std_len = np.std(len_values, ddof=1)
+
+    if std_len != 0:
+        k = min(k, mean_len / std_len, (config.length_limit - mean_len) / std_len)
+
+    return _filter(
+        indices, len_values, mean_len - k * std_len, mean_len + k * std_len, fences
+    )
+
+
+def _reasonable_interval_mask(left, right, indices, config=DEFAULT_CONFIG, fences=None):
+    """Reasonable interval processing on the intervals at indices"""
+
+    l = left[indices]
+    r = right[indices]
+    mean_left = np.mean(l)
+    mean_right = np.mean(r)
+    sigma_star = _sigma_star(
+        mean_left,
+        np.std(l, ddof=1),
+        mean_right,
+        np.std(r, ddof=1),
+        config.sigma_offset,
+    )
+    if fences is not None:
+        fences.append((indices, l, 2 * mean_left - sigma_star, sigma_star))
+        fences.append((indices, r, sigma_star, 2 * mean_right - sigma_star))
+    return indices[
+        (2 * mean_left - sigma_star <= l)
+        & (l < sigma_star)
+        & (sigma_star < r)
+        & (r <= 2 * mean_right - sigma_star)
+    ]
+
+
+_array_stages = [
+    ("data_part.outliers", _outlier_mask),
+    ("data_part.tolerance_limits", _tolerance_limit_mask),
+    ("data_part.reasonable_intervals", _reasonable_interval_mask),
+]
+
+
+def process_data_part(excel_workbook, config=DEFAULT_CONFIG):
+    # openpyxl is only needed for Excel files, and is slow to import
     from openpyxl import load_workbook
 
     # Open Excel file and get the active sheet
@@ -210,13 +405,7 @@ def process_data_part(excel_workbook):
 
     # Data Part
     for w, intervals in words.items():
-        words[w] = [x for x in intervals if bad_data_processing(x)]
-    for w, intervals in words.items():
-        words[w] = outlier_processing(intervals)
-    for w, intervals in words.items():
-        words[w] = tolerance_limit_processing(intervals)
-    for w, intervals in words.items():
-        words[w] = reasonable_interval_processing(intervals)
+        words[w] = profiling.word(w, data_part, intervals, config)
 
     # Serializing words dictionary as a json file
     with open("words.json", "w") as file:
@@ -225,6 +414,98 @@ def process_data_part(excel_workbook):
     return words
 
 
+def iter_excel_words(excel_workbook, words_per_pass=None):
+    """Reading the intervals of the words from an Excel file one word at a time
+
+    The workbook has the same layout as for process_data_part: a pair of columns
+    for each word, with the word on the first row. It is opened in read-only
+    mode and read row by row.
+
+    words_per_pass: None (the default) reads the sheet once, filling the
+        intervals of all the words together, so every interval of the survey
+        is in memory before the first word is yielded. A number of words only
+        keeps the columns of that many words in memory, at the cost of reading
+        through the whole sheet again for each group, which multiplies the
+        reading time by the number of groups; use it only when the intervals
+        of all the words do not fit in memory.
+    """
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(excel_workbook, read_only=True)
+    try:
+        ws = wb.active
+        header = next(ws.iter_rows(max_row=1, values_only=True), ())
+        starts = range(0, len(header) - 1, 2)
+        if words_per_pass is None:
+            words_per_pass = max(len(starts), 1)
+        for first in range(0, len(starts), words_per_pass):
+            group = starts[first : first + words_per_pass]
+            lower = [[] for _ in group]
+            upper = [[] for _ in group]
+            rows = ws.iter_rows(
+                min_row=2, min_col=group[0] + 1, max_col=group[-1] + 2, values_only=True
+            )
+            for row in rows:
+                for i, (l, u) in enumerate(zip(row[::2], row[1::2])):
+                    if l is not None:
+                        lower[i].append(l)
+                    if u is not None:
+                        upper[i].append(u)
+            for i, col in enumerate(group):
+                yield header[col], list(zip(lower[i], upper[i]))
+                lower[i] = upper[i] = None
+    finally:
+        wb.close()
+
+
+def iter_csv_words(csv_file, header=True):
+    """Reading the intervals of the words from a CSV file one word at a time
+
+    Each row holds a word, the left end and the right end of one interval, and
+    the rows of each word must be next to each other.
+    """
+
+    seen = set()
+    with open(csv_file, newline="") as file:
+        rows = csv.reader(file)
+        if header:
+            next(rows, None)
+        for word, group in itertools.groupby(rows, key=lambda row: row[0]):
+            if word in seen:
+                raise ValueError(f"the rows of {word!r} are not contiguous")
+            seen.add(word)
+            yield word, [(float(left), float(right)) for _, left, right in group]
+
+
+def stream_data_part(words, output="words.json", config=DEFAULT_CONFIG):
+    """Doing the data part word by word and writing the results incrementally
+
+    words: an iterable of (word, intervals) pairs, e.g. from iter_excel_words
+        or iter_csv_words
+    output: path of the json file, which has the same content as the one
+        written by process_data_part
+    config: an EIAConfig with the universe of discourse of the survey
+
+    Only one word is processed at a time, so memory use depends on the largest
+    word instead of the whole survey. Returns the number of words written.
+    """
+
+    count = 0
+    with open(output, "w") as file:
+        file.write("{")
+        for word, intervals in words:
+            if count:
+                file.write(", ")
+            intervals = profiling.word(word, data_part, intervals, config)
+            # the key is converted to a string the way json.dump does
+            file.write(json.dumps({word: intervals})[1:-1])
+            count += 1
+        file.write("}")
+
+    return count
+
+
 def main():
     process_data_part("sample-data.xlsx")
 
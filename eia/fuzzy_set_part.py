@@ -1,138 +1,162 @@
+import json
+
 import numpy as np
 
-lower_bound = 0
-upper_bound = 10
+from eia.config import DEFAULT_CONFIG, deprecated_bound
+from utils import profiling
+from utils.it2fs import SHAPES
+
+
+# the deprecated lower_bound and upper_bound globals, defined before main runs
+def __getattr__(name):
+    return deprecated_bound(__name__, name)
+
+
+_t_dist_table = [
+    6.314,
+    2.920,
+    2.353,
+    2.132,
+    2.015,
+    1.943,
+    1.895,
+    1.860,
+    1.833,
+    1.812,
+    1.796,
+    1.782,
+    1.771,
+    1.761,
+    1.753,
+    1.746,
+    1.740,
+    1.734,
+    1.729,
+    1.725,
+    1.721,
+    1.717,
+    1.714,
+    1.711,
+    1.708,
+    1.706,
+    1.703,
+    1.701,
+    1.699,
+    1.697,
+    1.684,
+]  # alpha = 0.05
+
+
+def min_intersection_height(fsl, fsr, fsc, block_size=None):
+    """Minimum intersection height over all pairs of interior embedded T1 FSs
+
+    The heights are computed block_size rows at a time while keeping a running
+    minimum, so memory stays linear in the number of embedded T1 FSs. Returns
+    the same (h, i, j) as the minimum and its first position over the full
+    n x n array of heights.
+    """
+
+    n = len(fsl)
+    if block_size is None:
+        block_size = max(1, 2**20 // n)
+
+    h, i, j = None, 0, 0
+    for start in range(0, n, block_size):
+        right = fsr[start : start + block_size, None]
+        center = fsc[start : start + block_size, None]
+        hs = (right - fsl) / (right - fsl + fsc - center)
+
+        index = np.argmin(hs)
+        if h is None or hs.flat[index] < h or np.isnan(hs.flat[index]):
+            h = hs.flat[index]
+            i, j = start + index // n, index % n
+            if np.isnan(h):
+                break
+
+    return h, i, j
+
+
+def classify_shape(left, right, config=DEFAULT_CONFIG):
+    """Establishing the nature of the FOU of a word
+
+    left, right: arrays of the left and right ends of the word intervals
+    config: an EIAConfig with the universe of discourse of the survey
+
+    The tests are those of classify_shapes on a single word, so a word gets
+    the same shape whether it is encoded alone or in a batch, even when its
+    means lie on the line of an admissible region.
+
+    Returns "left-shoulder", "right-shoulder" or "interior".
+    """
+
+    return SHAPES[classify_shapes(left, right, [0, len(left)], config)[0]]
+
+
+def embedded_t1fs(left, right, shape, config=DEFAULT_CONFIG):
+    """Left and right ends of the embedded T1 FSs of the word intervals
+
+    left, right: arrays of the left and right ends of the word intervals
+    shape: nature of the FOU, as returned by classify_shape
+    config: an EIAConfig with the universe of discourse of the survey
+
+    Returns the ends for every interval and a mask of the admissible ones.
+    """
+
+    middle = 0.5 * (left + right)
+    length = right - left
+    if shape == "left-shoulder":
+        fsl = middle - length / np.sqrt(6)
+        fsr = middle + np.sqrt(6) * length / 3
+    elif shape == "right-shoulder":
+        fsl = middle - np.sqrt(6) * length / 3
+        fsr = middle + length / np.sqrt(6)
+    else:
+        fsl = middle - np.sqrt(2) * length / 2
+        fsr = middle + np.sqrt(2) * length / 2
+
+    return fsl, fsr, (fsl >= config.lower) & (fsr <= config.upper)
+
 
+def fuzzy_part(intervals, config=DEFAULT_CONFIG):
+    """Doing the fuzzy set part for each word
 
-def fuzzy_part(intervals):
-    """Doing the fuzzy set part for each word"""
+    config: an EIAConfig with the universe of discourse of the survey
+    """
 
     # Keeping the words specification
     word_status = {}
 
-    # Admissible region determination
-    t_dist_table = [
-        6.314,
-        2.920,
-        2.353,
-        2.132,
-        2.015,
-        1.943,
-        1.895,
-        1.860,
-        1.833,
-        1.812,
-        1.796,
-        1.782,
-        1.771,
-        1.761,
-        1.753,
-        1.746,
-        1.740,
-        1.734,
-        1.729,
-        1.725,
-        1.721,
-        1.717,
-        1.714,
-        1.711,
-        1.708,
-        1.706,
-        1.703,
-        1.701,
-        1.699,
-        1.697,
-        1.684,
-    ]  # alpha = 0.05
-
-    t_alpha = t_dist_table[min(len(intervals), len(t_dist_table)) - 1]
-
-    mean_left = np.mean([x[0] for x in intervals])
-    mean_right = np.mean([x[1] for x in intervals])
-
-    c = [x[1] - 5.831 * x[0] for x in intervals]
-    d = [x[1] - 0.171 * x[0] - 8.29 for x in intervals]
-    shift1 = t_alpha * np.std(c, ddof=1) / np.sqrt(len(intervals))
-    shift2 = t_alpha * np.std(d, ddof=1) / np.sqrt(len(intervals))
-
-    # Establish the nature of FOUs
-    if (
-        mean_right > 5.831 * mean_left - shift1
-        and mean_right < 0.171 * mean_left + 8.29 - shift2
-    ):
-        # left shoulder embedded T1 FS
-        et1fs_left = [
-            0.5 * (x[0] + x[1]) - (x[1] - x[0]) / np.sqrt(6) for x in intervals
-        ]
-        et1fs_right = [
-            0.5 * (x[0] + x[1]) + np.sqrt(6) * (x[1] - x[0]) / 3 for x in intervals
-        ]
-
-        # Delete inadmissible embedded T1 FSs
-        admissibles = [
-            (x, y)
-            for (x, y) in zip(et1fs_left, et1fs_right)
-            if x >= lower_bound and y <= upper_bound
-        ]
-
-        fsl = np.array([x[0] for x in admissibles])
-        fsr = np.array([x[1] for x in admissibles])
-
-        # Compute the mathematical model for FOU(W~)
-        umf = [0, 0, max(fsl), max(fsr)]
-        lmf = [0, 0, min(fsl), min(fsr), 1]
-
-        word_status["shape"] = "left-shoulder"
-
-    elif (
-        mean_right < 5.831 * mean_left - shift1
-        and mean_right > 0.171 * mean_left + 8.29 - shift2
-    ):
-        # right shoulder embedded T1 FS
-        et1fs_left = [
-            0.5 * (x[0] + x[1]) - np.sqrt(6) * (x[1] - x[0]) / 3 for x in intervals
-        ]
-        et1fs_right = [
-            0.5 * (x[0] + x[1]) + (x[1] - x[0]) / np.sqrt(6) for x in intervals
-        ]
-
-        # Delete inadmissible embedded T1 FSs
-        admissibles = [
-            (x, y)
-            for (x, y) in zip(et1fs_left, et1fs_right)
-            if x >= lower_bound and y <= upper_bound
-        ]
-
-        fsl = np.array([x[0] for x in admissibles])
-        fsr = np.array([x[1] for x in admissibles])
-
-        # Compute the mathematical model for FOU(W~)
-        umf = [min(fsl), min(fsr), upper_bound, upper_bound]
-        lmf = [max(fsl), max(fsr), upper_bound, upper_bound, 1]
-
-        word_status["shape"] = "right-shoulder"
+    intervals = np.asarray(intervals, dtype=float).reshape(-1, 2)
+    shape = classify_shape(intervals[:, 0], intervals[:, 1], config)
+
+    # Delete inadmissible embedded T1 FSs
+    fsl, fsr, admissible = profiling.stage(
+        "fuzzy_set_part.embedded_t1fs",
+        embedded_t1fs,
+        intervals[:, 0],
+        intervals[:, 1],
+        shape,
+        config,
+    )
+    profiling.count(
+        "fuzzy_set_part.inadmissible", len(admissible) - np.count_nonzero(admissible)
+    )
+    fsl = fsl[admissible]
+    fsr = fsr[admissible]
+    admissibles: list[tuple[float, float]] = list(zip(fsl, fsr))
+
+    # Compute the mathematical model for FOU(W~)
+    if shape == "left-shoulder":
+        umf = [config.lower, config.lower, max(fsl), max(fsr)]
+        lmf = [config.lower, config.lower, min(fsl), min(fsr), 1]
+
+    elif shape == "right-shoulder":
+        umf = [min(fsl), min(fsr), config.upper, config.upper]
+        lmf = [max(fsl), max(fsr), config.upper, config.upper, 1]
 
     else:
-        # interior embedded T1 FS
-        et1fs_left = [
-            0.5 * (x[0] + x[1]) - np.sqrt(2) * (x[1] - x[0]) / 2 for x in intervals
-        ]
-        et1fs_right = [
-            0.5 * (x[0] + x[1]) + np.sqrt(2) * (x[1] - x[0]) / 2 for x in intervals
-        ]
-
-        # Delete inadmissible embedded T1 FSs
-        admissibles: list[tuple[float, float]] = [
-            (x, y)
-            for (x, y) in zip(et1fs_left, et1fs_right)
-            if x >= lower_bound and y <= upper_bound
-        ]
-
-        fsl = np.array([x[0] for x in admissibles])
-        fsr = np.array([x[1] for x in admissibles])
-        fsc = np.array([(x[0] + x[1]) / 2 for x in admissibles])
-
-        # Compute the mathematical model for FOU(W~)
+        fsc = (fsl + fsr) / 2
+
         l1 = min(fsl)
         l2 = max(fsl)
         r1 = min(fsr)
@@ -140,21 +164,15 @@ def fuzzy_part(intervals):
         c1 = min(fsc)
         c2 = max(fsc)
 
-        n = len(fsl)
-        hs = np.zeros(n**2)
-
-        for i in range(n):
-            hs[i * n + np.arange(n)] = (fsr[i] - fsl) / (fsr[i] - fsl + fsc - fsc[i])
-
-        h, index = np.min(hs), np.argmin(hs)
-        i = index // n
-        j = index % n
+        h, i, j = profiling.stage(
+            "fuzzy_set_part.height", min_intersection_height, fsl, fsr, fsc
+        )
         p = fsl[j] + h * (fsc[j] - fsl[j])
 
         umf = [l1, c1, c2, r2]
         lmf = [l2, p, p, r1, h]
 
-        word_status["shape"] = "interior"
+    word_status["shape"] = shape
 
     # collecting the final MF
     mf = [lmf, umf]
@@ -164,9 +182,153 @@ def fuzzy_part(intervals):
     return word_status
 
 
-def process_fuzzy_set_part():
-    import json
+def _segment_std(values, segments, starts, counts):
+    """Sample standard deviation (ddof=1) of each segment of values"""
+
+    means = np.add.reduceat(values, starts) / counts
+    squares = np.add.reduceat((values - means[segments]) ** 2, starts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.sqrt(squares / (counts - 1))
+
+
+def classify_shapes(left, right, offsets, config=DEFAULT_CONFIG):
+    """Establishing the nature of the FOUs of many words at once
 
+    left, right: ends of the intervals of all the words, one after another
+    offsets: the intervals of word k are those from offsets[k] to offsets[k + 1]
+    config: an EIAConfig with the universe of discourse of the survey
+
+    Returns the shape codes of the words, indexing SHAPES.
+    """
+
+    # Admissible region determination
+    offsets = np.asarray(offsets)
+    starts = offsets[:-1]
+    counts = np.diff(offsets)
+    segments = np.repeat(np.arange(len(counts)), counts)
+    t_alpha = np.array(_t_dist_table)[np.minimum(counts, len(_t_dist_table)) - 1]
+
+    # the lines of the admissible regions are given on [0, 10] and shifted
+    # and scaled to the universe of discourse
+    left = left - config.lower
+    right = right - config.lower
+    intercept = config.shoulder_intercept
+
+    mean_left = np.add.reduceat(left, starts) / counts
+    mean_right = np.add.reduceat(right, starts) / counts
+
+    c = right - 5.831 * left
+    d = right - 0.171 * left - intercept
+    shift1 = t_alpha * _segment_std(c, segments, starts, counts) / np.sqrt(counts)
+    shift2 = t_alpha * _segment_std(d, segments, starts, counts) / np.sqrt(counts)
+
+    # a single interval has no deviation, and its NaN shifts make the word
+    # interior
+    below1 = mean_right < 5.831 * mean_left - shift1
+    above1 = mean_right > 5.831 * mean_left - shift1
+    below2 = mean_right < 0.171 * mean_left + intercept - shift2
+    above2 = mean_right > 0.171 * mean_left + intercept - shift2
+
+    shapes = np.full(len(counts), SHAPES.index("interior"), dtype="i1")
+    shapes[above1 & below2] = SHAPES.index("left-shoulder")
+    shapes[below1 & above2] = SHAPES.index("right-shoulder")
+    return shapes
+
+
+def fuzzy_part_batch(intervals, offsets, config=DEFAULT_CONFIG):
+    """Doing the fuzzy set part for many words at once
+
+    intervals: (n, 2) array of the preprocessed intervals of all the words,
+        one word after another
+    offsets: N + 1 increasing indices, the intervals of word k are
+        intervals[offsets[k]:offsets[k + 1]]; every word needs an interval
+    config: an EIAConfig with the universe of discourse of the survey
+
+    The shape tests, embedded T1 FSs and the bounds of the FOUs are computed
+    with segmented reductions over the whole array; only the minimum
+    intersection height of the interior words is computed word by word.
+
+    Returns the (N, 9) MFs [a, b, c, d, e, f, g, i, h] of the words, their
+    shape codes indexing SHAPES, the (n, 2) embedded T1 FSs of the intervals
+    and a mask of the admissible ones. Words without an admissible embedded
+    T1 FS, for which fuzzy_part fails, get an MF of NaNs.
+    """
+
+    intervals = np.asarray(intervals, dtype=float).reshape(-1, 2)
+    offsets = np.asarray(offsets, dtype=np.intp)
+    counts = np.diff(offsets)
+    if offsets[0] != 0 or offsets[-1] != len(intervals) or np.any(counts <= 0):
+        raise ValueError("offsets must split the intervals into non-empty words")
+    left, right = intervals[:, 0], intervals[:, 1]
+    n_words = len(counts)
+
+    shapes = profiling.stage(
+        "fuzzy_set_part.shapes", classify_shapes, left, right, offsets, config
+    )
+    interval_shapes = np.repeat(shapes, counts)
+
+    def embedded(left, right):
+        fsl = np.empty_like(left)
+        fsr = np.empty_like(left)
+        admissible = np.empty(len(left), dtype=bool)
+        for code, shape in enumerate(SHAPES):
+            rows = interval_shapes == code
+            fsl[rows], fsr[rows], admissible[rows] = embedded_t1fs(
+                left[rows], right[rows], shape, config
+            )
+        return fsl, fsr, admissible
+
+    fsl, fsr, admissible = profiling.stage(
+        "fuzzy_set_part.embedded_t1fs", embedded, left, right
+    )
+    profiling.count(
+        "fuzzy_set_part.inadmissible", len(admissible) - np.count_nonzero(admissible)
+    )
+
+    # segments of the admissible embedded T1 FSs, skipping the empty ones
+    kept = np.bincount(
+        np.repeat(np.arange(n_words), counts)[admissible], minlength=n_words
+    )
+    bounds = np.concatenate([[0], np.cumsum(kept)])
+    words = np.flatnonzero(kept)
+    starts = bounds[:-1][words]
+    l, r = fsl[admissible], fsr[admissible]
+    c = (l + r) / 2
+    l1, l2 = np.minimum.reduceat(l, starts), np.maximum.reduceat(l, starts)
+    r1, r2 = np.minimum.reduceat(r, starts), np.maximum.reduceat(r, starts)
+    c1, c2 = np.minimum.reduceat(c, starts), np.maximum.reduceat(c, starts)
+
+    # the columns of the MFs of each shape, the heights of the interior ones
+    # are filled in below
+    mfs = np.full((n_words, 9), np.nan)
+    lower, upper = config.lower, config.upper
+    columns = {
+        "left-shoulder": [lower, lower, l2, r2, lower, lower, l1, r1, 1],
+        "right-shoulder": [l1, r1, upper, upper, l2, r2, upper, upper, 1],
+        "interior": [l1, c1, c2, r2, l2, np.nan, np.nan, r1, np.nan],
+    }
+    for code, shape in enumerate(SHAPES):
+        rows = shapes[words] == code
+        for column, values in enumerate(columns[shape]):
+            mfs[words[rows], column] = values if np.isscalar(values) else values[rows]
+
+    # the minimum intersection height is pairwise within each interior word
+    for k in np.flatnonzero(shapes[words] == SHAPES.index("interior")):
+        segment = slice(bounds[words[k]], bounds[words[k] + 1])
+        h, i, j = profiling.stage(
+            "fuzzy_set_part.height",
+            min_intersection_height,
+            l[segment],
+            r[segment],
+            c[segment],
+        )
+        p = l[segment][j] + h * (c[segment][j] - l[segment][j])
+        mfs[words[k], [5, 6, 8]] = p, p, h
+
+    return mfs, shapes, np.column_stack([fsl, fsr]), admissible
+
+
+def process_fuzzy_set_part(config=DEFAULT_CONFIG):
     # Reading the preprocessed words dictionary from the json file
     with open("words.json") as file:
         words = json.load(file)
@@ -174,7 +336,7 @@ def process_fuzzy_set_part():
 
     for word, intervals in words.items():
         if intervals:
-            words_status[word] = fuzzy_part(intervals)
+            words_status[word] = profiling.word(word, fuzzy_part, intervals, config)
 
     # Serializing words dictionary as a json file
     with open("words_status.json", "w") as file:
@@ -0,0 +1,430 @@
+from bisect import insort
+
+import numpy as np
+
+from eia.config import DEFAULT_CONFIG
+from eia.data_part import (
+    _sigma_star,
+    _tolerance_limits,
+    bad_data_processing,
+    data_part_indices,
+)
+from eia.fuzzy_set_part import classify_shape, embedded_t1fs, min_intersection_height
+
+
+def _pair_heights(fsl, fsr, fsc, rows, cols):
+    """Intersection heights of the pairs of embedded T1 FSs (rows[k], cols[k])"""
+
+    return (fsr[rows] - fsl[cols]) / (fsr[rows] - fsl[cols] + fsc[cols] - fsc[rows])
+
+
+def _iqr_fences(values):
+    """Outlier fences of a sorted list, rounded like the ones of np.percentile"""
+
+    quartiles = []
+    for q in (0.25, 0.75):
+        position = (len(values) - 1) * q
+        k = int(position)
+        t = position - k
+        below, above = values[k], values[min(k + 1, len(values) - 1)]
+        if t >= 0.5:
+            quartiles.append(above - (above - below) * (1 - t))
+        else:
+            quartiles.append(below + (above - below) * t)
+    q25, q75 = quartiles
+    return q25 - 1.5 * (q75 - q25), q75 + 1.5 * (q75 - q25)
+
+
+class _Untrusted(Exception):
+    """The running statistics cannot tell the survivors of the Data Part"""
+
+
+class _Moments:
+    """Running mean and sample standard deviation, from sums centered on the
+    mean of the values they started with"""
+
+    __slots__ = ("n", "center", "sum", "squares")
+
+    def __init__(self, values):
+        self.n = len(values)
+        self.center = float(np.mean(values))
+        self.sum = float(np.sum(values - self.center))
+        self.squares = float(np.sum((values - self.center) ** 2))
+
+    def add(self, value):
+        self.n += 1
+        self.sum += value - self.center
+        self.squares += (value - self.center) ** 2
+
+    @property
+    def mean(self):
+        return self.center + self.sum / self.n
+
+    @property
+    def std(self):
+        return np.sqrt(max(self.squares - self.sum**2 / self.n, 0) / (self.n - 1))
+
+
+class WordEncoder:
+    """Incremental EIA encoding of a single word.
+
+    Intervals can be added and removed as survey answers arrive. Each added
+    interval updates running statistics of the Data Part: sorted left ends,
+    right ends and lengths for the outlier fences, and running sums for the
+    tolerance limit and reasonable interval fences. If every fence stays
+    between the same stored values as in the last full Data Part, so that the
+    survivors can only gain the new interval, the Data Part is not re-run; it
+    is otherwise re-run with data_part_indices, and always after a removal.
+    The running statistics are not rounded like NumPy's, so a fence closer
+    than a rounding margin to a value also falls back to the full run.
+
+    The FOU is then re-derived from the previous one whenever possible: only
+    the pairwise intersection height of interior FOUs is more than linear in
+    the number of intervals, and it is updated from the pairs involving new
+    embedded T1 FSs. A full recompute is needed, and reported through
+    ``full_recompute``, when the shape of the FOU changes, when one of the two
+    embedded T1 FSs that define the height is removed, or when the Data Part
+    changed its survivors so much that fewer than half of the embedded T1 FSs
+    were already there.
+
+    config: an EIAConfig with the universe of discourse of the survey
+    """
+
+    def __init__(self, intervals=(), config=DEFAULT_CONFIG):
+        self.config = config
+        self._intervals = []
+        self._ids = []  # the intervals in order of arrival, for matching
+        self._next_id = 0
+        self._dirty = True  # the Data Part has to be re-run
+        self._changed = True  # the Fuzzy Set Part has to be re-run
+        self._fences = None  # running statistics of the Data Part
+        self._kept = np.empty((0, 2))
+        self._kept_ids = np.empty(0, dtype=np.intp)
+        self._status = None
+        self._height = None  # (h, i, j) of the interior FOU
+        self._et1fs_ids = np.empty(0, dtype=np.intp)
+        self.full_recompute = False
+        self.full_recomputes = 0
+        self.incremental_updates = 0
+        self.data_part_runs = 0
+
+        for interval in intervals:
+            self.add(interval)
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def add(self, interval):
+        """Adding an interval; returns False if it is rejected as bad data"""
+
+        interval = tuple(interval)
+        if not bad_data_processing(interval, self.config):
+            return False
+        self._intervals.append(interval)
+        self._ids.append(self._next_id)
+        self._next_id += 1
+        if not self._dirty:
+            try:
+                self._add_kept(interval)
+            except _Untrusted:
+                self._dirty = True
+        return True
+
+    def remove(self, interval):
+        """Removing a previously added interval"""
+
+        interval = tuple(interval)
+        if not bad_data_processing(interval, self.config):
+            return
+        k = self._intervals.index(interval)
+        del self._intervals[k]
+        del self._ids[k]
+        self._dirty = True
+
+    @property
+    def intervals(self):
+        """Intervals kept by the Data Part"""
+
+        self._refresh()
+        return self._kept.copy()
+
+    @property
+    def status(self):
+        """The word status, like the output of fuzzy_part; None if no admissible
+        embedded T1 FS is left"""
+
+        self._refresh()
+        return self._status
+
+    def _refresh(self):
+        if self._dirty:
+            self._data_part()
+        if self._changed:
+            self._update()
+
+    def _data_part(self):
+        """Running the whole Data Part, and restarting its running statistics"""
+
+        self._dirty = False
+        self._changed = True
+        self.data_part_runs += 1
+        intervals = np.array(self._intervals, dtype=float).reshape(-1, 2)
+        fences = []
+        indices = data_part_indices(intervals, self.config, fences)
+        self._kept = intervals[indices]
+        self._kept_ids = np.array(self._ids, dtype=np.intp)[indices]
+
+        # outlier, tolerance limit and reasonable interval fences, each on the
+        # left ends, the right ends and the lengths or again the right ends
+        self._fences = None
+        if len(fences) < 8 or min(len(values) for _, values, _, _ in fences) < 4:
+            return
+        # the nearest compared values on both sides of each fence
+        windows = []
+        for _, values, low, high in fences:
+            windows.append(
+                [
+                    values[values < low].max(initial=-np.inf),
+                    values[values >= low].min(initial=np.inf),
+                    values[values <= high].max(initial=-np.inf),
+                    values[values > high].min(initial=np.inf),
+                ]
+            )
+
+        left, right = intervals[:, 0], intervals[:, 1]
+        tolerance, length, reasonable = fences[3][0], fences[5][1], fences[6][0]
+        self._fences = {
+            "windows": windows,
+            "left": sorted(left.tolist()),
+            "right": sorted(right.tolist()),
+            "length": sorted(fences[2][1].tolist()),
+            "tolerance": (_Moments(left[tolerance]), _Moments(right[tolerance])),
+            "tolerance_length": _Moments(length),
+            "reasonable": (_Moments(left[reasonable]), _Moments(right[reasonable])),
+        }
+
+    def _fence(self, stage, low, high, value, margin=0):
+        """Whether value is within the new fences of a stage, and False when it
+        is not compared; raises _Untrusted if a stored value may have crossed
+        them, or may be on the other side of them for NumPy
+
+        margin: bound on the rounding errors of the fences, 0 if they are
+            rounded like in data_part_indices
+        """
+
+        window = self._fences["windows"][stage]
+        below_low, above_low, below_high, above_high = window
+        if margin:
+            trusted = (
+                below_low + margin < low < above_low - margin
+                and below_high + margin < high < above_high - margin
+            )
+        else:
+            trusted = below_low < low <= above_low and below_high <= high < above_high
+        if not trusted:
+            raise _Untrusted
+        if value is None:
+            return False
+        if margin and (abs(value - low) <= margin or abs(value - high) <= margin):
+            raise _Untrusted
+
+        if value < low:
+            window[0] = max(below_low, value)
+        else:
+            window[1] = min(above_low, value)
+        if value <= high:
+            window[2] = max(below_high, value)
+        else:
+            window[3] = min(above_high, value)
+        return low <= value <= high
+
+    def _add_kept(self, interval):
+        """Running the Data Part for one new interval on the running
+        statistics; raises _Untrusted if it has to be re-run instead"""
+
+        if self._fences is None:
+            raise _Untrusted
+        stats = self._fences
+        config = self.config
+        l, r = interval
+        length = r - l
+
+        # Outlier processing, with fences rounded exactly like np.percentile's
+        insort(stats["left"], l)
+        insort(stats["right"], r)
+        kept = self._fence(0, *_iqr_fences(stats["left"]), l)
+        kept = self._fence(1, *_iqr_fences(stats["right"]), r if kept else None)
+        if kept:
+            insort(stats["length"], length)
+        kept = self._fence(2, *_iqr_fences(stats["length"]), length if kept else None)
+
+        # The means and deviations are not rounded like NumPy's; both are
+        # sums of about n values of the universe, within this of exact ones
+        margin = (
+            1e-12 * (len(self._intervals) + 1) * (abs(config.lower) + abs(config.upper))
+        )
+
+        # Tolerance limit processing
+        left, right = stats["tolerance"]
+        if kept:
+            left.add(l)
+            right.add(r)
+        k = _tolerance_limits[min(left.n, len(_tolerance_limits)) - 1]
+        for stage, moments, value in [(3, left, l), (4, right, r)]:
+            spread = k * moments.std
+            kept = self._fence(
+                stage,
+                moments.mean - spread,
+                moments.mean + spread,
+                value if kept else None,
+                margin,
+            )
+        lengths = stats["tolerance_length"]
+        if kept:
+            lengths.add(length)
+        mean_len, std_len = lengths.mean, lengths.std
+        if std_len <= margin * 1e3:
+            raise _Untrusted
+        k = min(k, mean_len / std_len, (config.length_limit - mean_len) / std_len)
+        kept = self._fence(
+            5,
+            mean_len - k * std_len,
+            mean_len + k * std_len,
+            length if kept else None,
+            margin,
+        )
+
+        # Reasonable interval processing; sigma* is ill-conditioned when the
+        # two deviations are close
+        left, right = stats["reasonable"]
+        if kept:
+            left.add(l)
+            right.add(r)
+        moments = [left.mean, left.std, right.mean, right.std]
+        std_left, std_right = moments[1], moments[3]
+        if min(std_left, std_right) <= margin * 1e3 or abs(
+            std_left - std_right
+        ) <= 1e-3 * (std_left + std_right):
+            raise _Untrusted
+        sigma_star = _sigma_star(*moments, config.sigma_offset)
+
+        # the rounding errors of the moments are amplified in sigma*, by about
+        # its sensitivity to them, which finite differences on both sides also
+        # make large near a switch between its two roots
+        step = 1e-6 * config.span
+        sensitivity = 0
+        for k in range(4):
+            slopes = [0]
+            for shift in (-step, step):
+                shifted = list(moments)
+                shifted[k] += shift
+                shifted = _sigma_star(*shifted, config.sigma_offset)
+                slopes.append(abs(shifted - sigma_star) / step)
+            sensitivity += max(slopes)
+        margin *= 2 + 2 * sensitivity
+        low = self._fence(
+            6, 2 * moments[0] - sigma_star, sigma_star, l if kept else None, margin
+        )
+        high = self._fence(
+            7, sigma_star, 2 * moments[2] - sigma_star, r if kept else None, margin
+        )
+
+        if low and high:
+            self._kept = np.concatenate([self._kept, [interval]])
+            self._kept_ids = np.append(self._kept_ids, self._ids[-1])
+            self._changed = True
+
+    def _update(self):
+        self._changed = False
+        intervals = self._kept
+        if not len(intervals):
+            self._reset()
+            return
+
+        left, right = intervals[:, 0], intervals[:, 1]
+        shape = classify_shape(left, right, self.config)
+        fsl, fsr, admissible = embedded_t1fs(left, right, shape, self.config)
+        lower, upper = self.config.lower, self.config.upper
+        fsl = fsl[admissible]
+        fsr = fsr[admissible]
+        if not len(fsl):
+            self._reset()
+            return
+        et1fs = list(zip(fsl.tolist(), fsr.tolist()))
+        ids = self._kept_ids[admissible]
+
+        if shape == "left-shoulder":
+            umf = [lower, lower, fsl.max(), fsr.max()]
+            lmf = [lower, lower, fsl.min(), fsr.min(), 1]
+        elif shape == "right-shoulder":
+            umf = [fsl.min(), fsr.min(), upper, upper]
+            lmf = [fsl.max(), fsr.max(), upper, upper, 1]
+        else:
+            fsc = (fsl + fsr) / 2
+            previous = self._status["shape"] if self._status else None
+            height = None
+            if previous == "interior":
+                height = self._update_height(ids, fsl, fsr, fsc)
+            self.full_recompute = height is None
+            if height is None:
+                height = min_intersection_height(fsl, fsr, fsc)
+                self.full_recomputes += 1
+            else:
+                self.incremental_updates += 1
+            self._height = h, i, j = height
+            p = fsl[j] + h * (fsc[j] - fsl[j])
+            umf = [fsl.min(), fsc.min(), fsc.max(), fsr.max()]
+            lmf = [fsl.max(), p, p, fsr.min(), h]
+
+        self._et1fs_ids = ids
+        self._status = {"shape": shape, "MF": [lmf, umf], "ET1FS": et1fs}
+
+    def _reset(self):
+        self._status = None
+        self._height = None
+        self._et1fs_ids = np.empty(0, dtype=np.intp)
+
+    def _update_height(self, ids, fsl, fsr, fsc):
+        """Minimum intersection height after the embedded T1 FSs changed from
+        the previous ones, or None if it needs a full recompute
+
+        ids: the intervals of the embedded T1 FSs, in increasing order like
+            the ones of the previous embedded T1 FSs
+        """
+
+        h, i, j = self._height
+        old = self._et1fs_ids
+        n = len(ids)
+
+        # The embedded T1 FSs of intervals that were already there keep their
+        # pairwise heights, and every other one is new
+        positions = np.minimum(np.searchsorted(ids, old), n - 1)
+        found = ids[positions] == old
+        if not (found[i] and found[j]):
+            return None
+        kept = np.zeros(n, dtype=bool)
+        kept[positions[found]] = True
+        if np.count_nonzero(kept) < n - np.count_nonzero(kept):
+            return None
+        i, j = positions[i], positions[j]
+
+        # Pairs with a new embedded T1 FS as the row or the column, compared in
+        # the row-major order used by min_intersection_height
+        known = np.flatnonzero(kept)
+        new = np.flatnonzero(~kept)
+        rows = np.concatenate([np.repeat(known, len(new)), np.repeat(new, n)])
+        cols = np.concatenate(
+            [np.tile(new, len(known)), np.tile(np.arange(n), len(new))]
+        )
+        if not len(rows):
+            return h, i, j
+
+        heights = _pair_heights(fsl, fsr, fsc, rows, cols)
+        candidates = np.concatenate([[h], heights])
+        if np.isnan(candidates).any():
+            return None
+        order = np.lexsort((np.append(j, cols), np.append(i, rows)))
+        best = order[np.argmin(candidates[order])]
+        if best == 0:
+            return h, i, j
+        return heights[best - 1], rows[best - 1], cols[best - 1]
@@ -0,0 +1,92 @@
+from functools import partial
+
+from eia.config import DEFAULT_CONFIG
+from eia.data_part import data_part
+from eia.fuzzy_set_part import fuzzy_part
+from utils import profiling
+
+
+def encode_word(intervals, config=DEFAULT_CONFIG):
+    """Doing the data part and the fuzzy set part for one word
+
+    config: an EIAConfig with the universe of discourse of the survey
+
+    Returns the preprocessed intervals and the word status, which is None when
+    no interval survives the data part.
+    """
+
+    intervals = data_part(intervals, config)
+    return intervals, fuzzy_part(intervals, config) if intervals else None
+
+
+def _encode_item(item, config=DEFAULT_CONFIG, profiled=False):
+    word, intervals = item
+    profile = profiling.Profile() if profiled else None
+    try:
+        if profile is None:
+            return (
+                word,
+                profiling.word(word, encode_word, intervals, config),
+                None,
+                None,
+            )
+        with profile:
+            result = profiling.word(word, encode_word, intervals, config)
+        return word, result, None, profile.to_dict()
+    except Exception as error:
+        return word, None, f"{type(error).__name__}: {error}", None
+
+
+def run_eia(words, workers=None, chunksize=1, config=DEFAULT_CONFIG):
+    """Running the EIA for many words over a pool of processes
+
+    words: a dictionary or an iterable of (word, intervals) pairs
+    workers: number of worker processes, defaults to the number of CPUs;
+        0 runs everything in the current process
+    chunksize: number of words sent to a worker at a time
+    config: an EIAConfig with the universe of discourse of the survey
+
+    Each word is independent, so a word that fails is reported in the errors
+    without stopping the others. The results are in the same order as the
+    input and are identical to running process_data_part and
+    process_fuzzy_set_part serially.
+
+    return values:
+    words: preprocessed intervals of each word, like process_data_part
+    words_status: status of each word with intervals, like process_fuzzy_set_part
+    errors: an error message for each word that failed
+    """
+
+    items = words.items() if isinstance(words, dict) else words
+    intervals_out = {}
+    words_status = {}
+    errors = {}
+
+    profile = profiling.active()
+    if workers == 0:
+        results = map(partial(_encode_item, config=config), items)
+    else:
+        # imported here, so that encoding in the current process does not pay
+        # for the multiprocessing machinery at startup
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(workers)
+        # the workers record into their own profiles, merged into the active one
+        encode = partial(_encode_item, config=config, profiled=profile is not None)
+        results = executor.map(encode, items, chunksize=chunksize)
+
+    try:
+        for word, result, error, worker_profile in results:
+            if worker_profile is not None:
+                profile.merge(worker_profile)
+            if error is not None:
+                errors[word] = error
+                continue
+            intervals_out[word], status = result
+            if status is not None:
+                words_status[word] = status
+    finally:
+        if workers != 0:
+            executor.shutdown()
+
+    return intervals_out, words_status, errors
@@ -0,0 +1,59 @@
+import json
+
+import numpy as np
+
+from benchmarks import generators
+from benchmarks.run import compare, main, run_benchmarks
+
+
+def test_codebook():
+    mfs = generators.codebook(500)
+
+    a, b, c, d, e, f, g, i, h = mfs.T
+    assert np.all((a <= b) & (b <= c) & (c <= d))
+    assert np.all((e <= f) & (f <= g) & (g <= i))
+    assert np.all((a <= e) & (i <= d))
+    assert np.all((0 < h) & (h <= 1))
+
+
+def test_run_benchmarks():
+    results = run_benchmarks("quick", pattern="centroid_it2_", min_time=0)
+
+    assert {(r["name"], r["size"]) for r in results} == {
+        ("utils.centroid_it2_batch", 10),
+        ("utils.centroid_it2_batch", 100),
+        ("utils.centroid_it2_exact", 10),
+        ("utils.centroid_it2_exact", 100),
+    }
+    for result in results:
+        assert result["ops_per_sec"] > 0
+        assert result["peak_memory"] > 0
+
+
+def test_compare(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    assert (
+        main(
+            [
+                "--suite",
+                "quick",
+                "--filter",
+                "mg_array",
+                "--min-time",
+                "0",
+                "--output",
+                str(baseline),
+            ]
+        )
+        == 0
+    )
+
+    with open(baseline) as file:
+        saved = json.load(file)
+    assert saved["meta"]["numpy"] == np.__version__
+
+    slower = [dict(r, ops_per_sec=r["ops_per_sec"] / 2) for r in saved["results"]]
+    rows = compare(slower, saved, threshold=0.2)
+    assert len(rows) == len(saved["results"])
+    assert all(row["regression"] and row["ratio"] == 0.5 for row in rows)
+    assert not any(row["regression"] for row in compare(saved["results"], saved))
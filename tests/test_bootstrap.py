@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from eia.bootstrap import bootstrap_replicates, bootstrap_word, run_bootstrap
+from eia.data_part import data_part_array, iter_excel_words
+from eia.fuzzy_set_part import SHAPES, fuzzy_part
+
+tests_dir = Path(__file__).parent
+
+words = dict(iter_excel_words(tests_dir.parent / "sample-data.xlsx", 100))
+
+
+def test_bootstrap_replicates():
+    intervals = words["Some"]
+    mfs, shapes = bootstrap_replicates(intervals, 20, seed=3)
+
+    assert mfs.shape == (20, 9)
+    # the same seed draws the same resamples, encoded like fuzzy_part
+    rng = np.random.default_rng(3)
+    samples = np.array(intervals)[rng.integers(0, len(intervals), (20, len(intervals)))]
+    for mf, shape, sample in zip(mfs, shapes, samples):
+        status = fuzzy_part(data_part_array(sample))
+        assert SHAPES[shape] == status["shape"]
+        assert mf.tolist() == [*status["MF"][1], *status["MF"][0]]
+
+
+def test_bootstrap_word():
+    bands = bootstrap_word(words["Little"], 200, seed=0, quantiles=(0.05, 0.5, 0.95))
+
+    assert bands["shape"] == "left-shoulder"
+    assert bands["valid"] == bands["replicates"] == 200
+    assert sum(bands["shapes"].values()) == pytest.approx(1)
+    assert bands["stability"] == bands["shapes"]["left-shoulder"]
+    low, median, high = (np.array([*lmf, *umf]) for lmf, umf in bands["MF"])
+    assert np.all(low <= median) and np.all(median <= high)
+
+
+@pytest.mark.parametrize("intervals", [[], [(0, 20), (5, 4)]])
+def test_bootstrap_word_no_fou(intervals):
+    bands = bootstrap_word(intervals, 10, seed=0)
+
+    assert bands["shape"] is None
+    assert bands["valid"] == 0
+    assert bands["stability"] == 0.0
+    assert np.isnan(bands["MF"][0][0]).all()
+
+
+@pytest.mark.parametrize("workers, chunksize", [(2, 1), (2, 5)])
+def test_run_bootstrap_reproducible(workers, chunksize):
+    sample = {word: words[word] for word in list(words)[:6]}
+    sample["broken"] = [(0, 1), None]
+
+    bands, errors = run_bootstrap(sample, 50, seed=7, workers=0)
+    parallel_bands, parallel_errors = run_bootstrap(
+        sample, 50, seed=7, workers=workers, chunksize=chunksize
+    )
+
+    assert list(errors) == list(parallel_errors) == ["broken"]
+    assert list(bands) == list(sample)[:-1]
+    assert json.dumps(parallel_bands) == json.dumps(bands)
+    assert json.dumps(run_bootstrap(sample, 50, seed=8, workers=0)[0]) != json.dumps(
+        bands
+    )
@@ -0,0 +1,79 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from utils.caching import FOUCache, fou_key
+from utils.centroid_it2fs import centroid_it2
+from utils.linguistic_weighted_average import lwa
+from utils.similarity_measures import jaccard
+
+tests_dir = Path(__file__).parent
+fixtures_dir = tests_dir / "fixtures"
+
+with open(fixtures_dir / "words_status.json") as file:
+    words_status = json.load(file)
+
+mfs = [status["MF"] for status in words_status.values()]
+fous = [status["MF"][1] + status["MF"][0] for status in words_status.values()]
+
+
+def test_fou_key():
+    mf = [[2, 3, 3, 4, 0.5], [1, 2.5, 3.5, 5]]
+    key = fou_key(mf)
+
+    assert key == fou_key([1, 2.5, 3.5, 5, 2, 3, 3, 4, 0.5])
+    assert key == fou_key([1, 2.5, 3.5, 5, 2, 3, 3, 4 + 1e-12, 0.5])
+    assert fou_key([-0.0, 0, 1, 2, 0, 0, 1, 2]) == fou_key([0, 0, 1, 2, 0, 0, 1, 2, 1])
+    assert str(fou_key([-1e-12] * 9)) == str(fou_key([0] * 9))
+
+
+def test_cached_functions():
+    cache = FOUCache()
+
+    for mf in mfs:
+        assert cache.centroid_it2(mf) == pytest.approx(centroid_it2(mf))
+    assert cache.jaccard(fous[0], fous[1]) == pytest.approx(jaccard(fous[0], fous[1]))
+    assert cache.lwa(fous[:3], fous[3:6])[0] == pytest.approx(
+        lwa(fous[:3], fous[3:6])[0]
+    )
+    assert cache.info()["hits"] == 0
+
+    cache.centroid_it2(fous[0])
+    cache.jaccard(mfs[1], fous[0])
+    cache.lwa(mfs[:3], fous[3:6])
+    assert (cache.hits, cache.misses) == (3, len(mfs) + 2)
+
+    # results are copies
+    cache.centroid_it2(mfs[0]).clear()
+    assert len(cache.centroid_it2(mfs[0])) == 3
+
+
+def test_lru_and_ttl():
+    now = [0]
+    cache = FOUCache(maxsize=2, ttl=10, timer=lambda: now[0])
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    now[0] = 10
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+    assert len(cache) == 0
+
+
+def test_threads():
+    cache = FOUCache(maxsize=20)
+    calls = [mf for mf in mfs * 20]
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(cache.centroid_it2, calls))
+
+    assert results[: len(mfs)] == results[-len(mfs) :]
+    assert cache.hits + cache.misses == len(calls)
+    assert len(cache) == 20
@@ -0,0 +1,122 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from utils.centroid_it2fs import (
+    centroid_it2,
+    centroid_it2_batch,
+    centroid_it2_exact,
+    ekm,
+    ekm_batch,
+    ekm_solve,
+    mg,
+    mg_array,
+)
+
+tests_dir = Path(__file__).parent
+fixtures_dir = tests_dir / "fixtures"
+
+with open(fixtures_dir / "words_status.json") as file:
+    words_status = json.load(file)
+
+mfs = [status["MF"] for status in words_status.values()]
+
+
+@pytest.mark.parametrize(
+    "xmf, umf, expected",
+    [
+        ([1, 2, 3, 4], [0, 1, 1, 0], [0, 0, 0.5, 1, 1, 0.5, 0]),
+        ([1, 2.5, 2.5, 4], [0, 0.5, 0.5, 0], [0, 0, 1 / 6, 1 / 3, 0.5, 1 / 6, 0]),
+        ([0, 0, 2, 4], [0, 1, 1, 0], [0, 1, 1, 1, 0.75, 0.25, 0]),
+    ],
+)
+def test_mg(xmf, umf, expected):
+    x = [0, 1, 1.5, 2, 2.5, 3.5, 4]
+    assert mg(x, xmf, umf) == pytest.approx(expected)
+
+
+def test_mg_array_batch():
+    x = np.linspace(0, 10, 50)
+    xmf = np.array([[umf[i] for i in range(4)] for _, umf in mfs])
+
+    output = mg_array(x, xmf)
+
+    assert output.shape == (len(mfs), len(x))
+    for row, params in zip(output, xmf):
+        assert row.tolist() == mg(x, params)
+
+
+def test_centroid_it2_batch_matches_scalar():
+    fous = np.array([umf + lmf for lmf, umf in mfs])
+    expected = np.array([centroid_it2(mf) for mf in mfs])
+
+    output = centroid_it2_batch(fous)
+
+    assert output.shape == (len(mfs), 3)
+    assert output == pytest.approx(expected, abs=1e-9)
+
+
+def test_centroid_it2_batch_zero_lmf():
+    fou = [0, 0, 3, 5, 0, 0, 1, 2, 0]
+    assert centroid_it2_batch([fou])[0] == pytest.approx(
+        centroid_it2([fou[4:], fou[:4]])
+    )
+
+
+def test_centroid_it2_batch_empty():
+    assert centroid_it2_batch(np.zeros((0, 9))).shape == (0, 3)
+
+
+def test_centroid_it2_exact_type1():
+    # An IT2 FS whose LMF equals its UMF has a single-point centroid
+    output = centroid_it2_exact([[1, 2, 4, 5, 1, 2, 4, 5, 1]])[0]
+    assert output == pytest.approx([3, 3, 3])
+
+
+def test_centroid_it2_exact_matches_fine_sampling():
+    interiors = [
+        status["MF"] for status in words_status.values() if status["shape"] == "interior"
+    ]
+    for mf in interiors:
+        assert centroid_it2(mf, exact=True) == pytest.approx(
+            centroid_it2(mf, num=5000), abs=1e-4
+        )
+
+
+@pytest.mark.parametrize("max_flag", [-1, 1])
+def test_ekm_warm_start(max_flag):
+    x = np.linspace(1, 9, 200)
+    lower = mg_array(x, [3, 5, 5, 7], [0, 0.6, 0.6, 0])
+    upper = mg_array(x, [1, 4, 6, 9])
+    y, k, iterations = ekm_solve(x, lower, upper, max_flag)
+
+    assert ekm(x.tolist(), lower.tolist(), upper.tolist(), max_flag) == pytest.approx(y)
+    assert x[k] <= y < x[k + 1]
+    for k0 in [0, 50, 199]:
+        assert ekm_solve(x, lower, upper, max_flag, k0)[:2] == pytest.approx((y, k))
+    assert ekm_solve(x, lower, upper, max_flag, k)[2] == 0
+    assert ekm(x, lower, upper, max_flag, start=y, full_output=True)[2] <= iterations
+    assert ekm_batch([x] * 3, [lower] * 3, [upper] * 3, max_flag, [1, 5, 9]) == (
+        pytest.approx([y] * 3)
+    )
+
+
+def test_ekm_full_output_direct():
+    assert ekm([1, 2, 3], [0, 0, 0], [1, 1, 1], 1, full_output=True) == (3, None, None)
+
+
+@pytest.mark.parametrize(
+    "x, lower, upper, max_flag, expected",
+    [
+        # no x is above y, which is the largest x
+        ([1, 2, 3], [0, 0, 1], [1, 1, 1], 1, 3),
+        # y rounds just below the smallest x, which used to flip the switch
+        # index between -1 and 0 forever
+        ([2.63, 6.49], [0.365, 0], [0.42, 0.377], -1, 2.63),
+    ],
+)
+def test_ekm_terminates(x, lower, upper, max_flag, expected):
+    assert ekm(x, lower, upper, max_flag) == pytest.approx(expected)
+    assert ekm_batch([x], [lower], [upper], max_flag) == pytest.approx([expected])
@@ -0,0 +1,119 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from utils.centroid_it2fs import centroid_it2, centroid_it2_batch
+from utils.codebook import Codebook, LazyCodebook, write_codebook
+
+tests_dir = Path(__file__).parent
+fixtures_dir = tests_dir / "fixtures"
+
+with open(fixtures_dir / "words_status.json") as file:
+    words_status = json.load(file)
+
+
+@pytest.fixture
+def codebook(tmp_path):
+    write_codebook(words_status, tmp_path / "words.cb")
+    return Codebook(tmp_path / "words.cb")
+
+
+def test_codebook_roundtrip(codebook):
+    assert len(codebook) == len(words_status)
+    assert codebook.words == list(words_status)
+    for word, status in words_status.items():
+        assert word in codebook
+        assert codebook[word] == status
+    assert "missing" not in codebook
+    with pytest.raises(KeyError):
+        codebook.mf("missing")
+
+
+def test_codebook_is_memory_mapped(codebook):
+    assert np.shares_memory(codebook.mfs, codebook._raw)
+    assert not codebook.mfs.flags.writeable
+
+    expected = [centroid_it2(status["MF"]) for status in words_status.values()]
+    assert centroid_it2_batch(codebook.mfs) == pytest.approx(np.array(expected))
+
+
+def test_codebook_bad_file(tmp_path):
+    (tmp_path / "words.json").write_bytes(b"{}" * 64)
+    with pytest.raises(ValueError):
+        Codebook(tmp_path / "words.json")
+    (tmp_path / "short").write_bytes(b"{}")
+    with pytest.raises(ValueError):
+        Codebook(tmp_path / "short")
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    path = tmp_path / "words_status.json"
+    path.write_text((fixtures_dir / "words_status.json").read_text())
+    return path
+
+
+def test_lazy_codebook(json_path):
+    codebook = LazyCodebook(json_path)
+
+    assert len(codebook) == len(words_status)
+    assert list(codebook) == list(words_status)
+    for word, status in words_status.items():
+        assert codebook.shape(word) == status["shape"]
+        assert codebook.mf(word) == status["MF"]
+        assert codebook.et1fs(word).tolist() == [list(fs) for fs in status["ET1FS"]]
+        assert codebook[word] == status
+    assert "missing" not in codebook
+    with pytest.raises(KeyError):
+        codebook.mf("missing")
+
+    fous = [status["MF"][1] + status["MF"][0] for status in words_status.values()]
+    assert codebook.fous().tolist() == fous
+
+
+def test_lazy_codebook_decodes_on_demand(json_path):
+    codebook = LazyCodebook(json_path)
+    assert not codebook._mfs and not codebook._shapes
+
+    codebook.mf("Little")
+    assert list(codebook._mfs) == [codebook.index("Little")]
+    assert not codebook._shapes
+
+
+def test_lazy_codebook_index_cache(json_path):
+    index_path = json_path.with_name(json_path.name + ".index")
+    LazyCodebook(json_path)
+    assert list(json_path.parent.iterdir()) == [json_path]
+
+    words = LazyCodebook(json_path, index_cache=True).words
+    assert index_path.exists()
+    assert LazyCodebook(json_path, index_cache=True).words == words
+
+    # or in a cache directory of its own
+    cached = json_path.parent / "cache" / "words.index"
+    cached.parent.mkdir()
+    assert LazyCodebook(json_path, index_cache=cached).words == words
+    assert cached.exists()
+
+    # a changed file is indexed again
+    quoted = {"shape": "interior", "MF": words_status["Some"]["MF"]}
+    status = {"first word": words_status["Little"], 'a "quoted" word': quoted}
+    json_path.write_text(json.dumps(status, indent=2))
+    codebook = LazyCodebook(json_path, index_cache=True)
+    assert codebook.words == list(status)
+    assert codebook["first word"] == status["first word"]
+    assert codebook.mf('a "quoted" word') == quoted["MF"]
+    assert codebook.et1fs('a "quoted" word').shape == (0, 2)
+
+
+def test_lazy_codebook_bad_file(tmp_path):
+    (tmp_path / "empty.json").write_text("{}")
+    assert len(LazyCodebook(tmp_path / "empty.json")) == 0
+    (tmp_path / "words.cb").write_bytes(b"IT2FSCB1" + b"\0" * 64)
+    with pytest.raises(ValueError):
+        LazyCodebook(tmp_path / "words.cb")
+    (tmp_path / "list.json").write_text("[1, 2]")
+    with pytest.raises(ValueError):
+        LazyCodebook(tmp_path / "list.json")
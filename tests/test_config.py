@@ -0,0 +1,108 @@
+import importlib
+import json
+from pathlib import Path
+
+import pytest
+
+from eia.config import DEFAULT_CONFIG, EIAConfig
+from eia.data_part import data_part, data_part_array, iter_excel_words
+from eia.fuzzy_set_part import fuzzy_part
+from eia.incremental import WordEncoder
+from eia.parallel import encode_word, run_eia
+from utils.similarity_measures import JaccardIndex, jaccard_matrix
+
+tests_dir = Path(__file__).parent
+fixtures_dir = tests_dir / "fixtures"
+
+words = dict(iter_excel_words(tests_dir.parent / "sample-data.xlsx", 100))
+
+# a survey on [-10, 10], i.e. the sample data scaled by 2 and shifted by -10
+shift, scale = -10, 2
+config = EIAConfig(shift, shift + 10 * scale)
+
+
+def rescale(intervals):
+    return [(shift + scale * left, shift + scale * right) for left, right in intervals]
+
+
+def test_config_defaults():
+    assert DEFAULT_CONFIG == EIAConfig(0, 10)
+    assert DEFAULT_CONFIG.length_limit == 100
+    assert DEFAULT_CONFIG.shoulder_intercept == pytest.approx(8.29)
+    assert config.span == 20
+    assert EIAConfig(0, 10, max_length=50).length_limit == 50
+
+
+@pytest.mark.parametrize("lower, upper", [(0, 0), (10, 0)])
+def test_config_invalid(lower, upper):
+    with pytest.raises(ValueError):
+        EIAConfig(lower, upper)
+
+
+@pytest.mark.parametrize("module", ["eia.data_part", "eia.fuzzy_set_part"])
+def test_deprecated_bounds(module):
+    module = importlib.import_module(module)
+    with pytest.warns(DeprecationWarning):
+        assert module.lower_bound == DEFAULT_CONFIG.lower
+    with pytest.warns(DeprecationWarning):
+        assert module.upper_bound == DEFAULT_CONFIG.upper
+    with pytest.raises(AttributeError):
+        module.missing
+
+
+def test_default_config_unchanged():
+    with open(fixtures_dir / "words_status.json") as file:
+        expected_status = json.load(file)
+
+    for word in ["Little", "Some", "Very large"]:
+        intervals = data_part(words[word], DEFAULT_CONFIG)
+        assert intervals == data_part(words[word])
+        status = fuzzy_part(intervals, DEFAULT_CONFIG)
+        assert status["shape"] == expected_status[word]["shape"]
+
+
+@pytest.mark.parametrize("word", list(words))
+def test_rescaled_survey(word):
+    intervals, status = encode_word(words[word])
+    scaled_intervals, scaled_status = encode_word(rescale(words[word]), config)
+
+    assert len(scaled_intervals) == len(intervals)
+    assert scaled_status["shape"] == status["shape"]
+    lower, upper = status["MF"]
+    scaled_lower, scaled_upper = scaled_status["MF"]
+    # the x values are mapped by the rescaling, the heights are unchanged
+    assert scaled_upper == pytest.approx([shift + scale * x for x in upper])
+    assert scaled_lower[:4] == pytest.approx([shift + scale * x for x in lower[:4]])
+    assert scaled_lower[4] == pytest.approx(lower[4])
+
+
+def test_rescaled_data_part_array():
+    intervals = data_part(rescale(words["Some"]), config)
+    assert data_part_array(rescale(words["Some"]), config).tolist() == [
+        list(interval) for interval in intervals
+    ]
+
+
+def test_rescaled_word_encoder():
+    intervals = rescale(words["Little"])
+    encoder = WordEncoder(intervals, config)
+    assert encoder.status["shape"] == encode_word(intervals, config)[1]["shape"]
+
+
+def test_run_eia_config():
+    sample = {word: rescale(words[word]) for word in ["Little", "Some", "Large"]}
+    intervals, words_status, errors = run_eia(sample, workers=2, config=config)
+
+    assert not errors
+    for word in sample:
+        assert words_status[word] == encode_word(sample[word], config)[1]
+
+
+def test_similarity_config():
+    mfs = [[0, 1, 2, 3, 0.5, 1, 2, 2.5, 0.8], [1, 2, 3, 4, 1.5, 2, 3, 3.5, 0.8]]
+    wide = EIAConfig(0, 20)
+    assert jaccard_matrix(mfs, config=wide) == pytest.approx(
+        jaccard_matrix(mfs, lower=0, upper=20)
+    )
+    index = JaccardIndex(["a", "b"], mfs, config=wide)
+    assert index.x[0] == 0 and index.x[-1] == 20
@@ -1,7 +1,21 @@
+import csv
+import json
+from pathlib import Path
+
+import numpy as np
 import pytest
 
 from eia.data_part import bad_data_processing
+from eia.data_part import data_part
+from eia.data_part import data_part_array
+from eia.data_part import iter_csv_words
+from eia.data_part import iter_excel_words
 from eia.data_part import outlier_processing
+from eia.data_part import process_data_part
+from eia.data_part import stream_data_part
+
+tests_dir = Path(__file__).parent
+fixtures_dir = tests_dir / "fixtures"
 
 valid_intervals = [
     ([0, 5], True),
@@ -46,3 +60,82 @@ test_cases = [
 def test_outlier_processing(input, expected):
     output = outlier_processing(input)
     assert output == expected
+
+
+@pytest.mark.parametrize("words_per_pass", [None, 1, 7])
+def test_stream_data_part_excel(tmp_path, words_per_pass):
+    words = iter_excel_words(tests_dir.parent / "sample-data.xlsx", words_per_pass)
+    output = tmp_path / "words.json"
+    count = stream_data_part(words, output)
+
+    assert output.read_bytes() == (fixtures_dir / "words.json").read_bytes()
+    assert count == len(json.loads(output.read_text()))
+
+
+def test_stream_data_part_csv(tmp_path):
+    rows = [("word", "left", "right")]
+    for word, intervals in iter_excel_words(tests_dir.parent / "sample-data.xlsx", 100):
+        rows.extend((word, left, right) for left, right in intervals)
+    with open(tmp_path / "words.csv", "w", newline="") as file:
+        csv.writer(file).writerows(rows)
+
+    stream_data_part(iter_csv_words(tmp_path / "words.csv"), tmp_path / "words.json")
+
+    with open(fixtures_dir / "words.json") as file:
+        expected = json.load(file)
+    with open(tmp_path / "words.json") as file:
+        assert json.load(file) == expected
+
+
+def test_stream_data_part_keys(tmp_path, monkeypatch):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    words = [5, 2.5, True, None, "Some"]
+    for k, word in enumerate(words):
+        workbook.active.cell(1, 2 * k + 1, word)
+        for row, interval in enumerate([(1, 3), (2, 4), (2, 5)], 2):
+            workbook.active.cell(row, 2 * k + 1, interval[0] + k % 3)
+            workbook.active.cell(row, 2 * k + 2, interval[1] + k % 3)
+    workbook.save(tmp_path / "words.xlsx")
+
+    monkeypatch.chdir(tmp_path)
+    process_data_part(tmp_path / "words.xlsx")
+    with open(tmp_path / "words.json") as file:
+        expected = json.load(file)
+
+    words = iter_excel_words(tmp_path / "words.xlsx")
+    assert stream_data_part(words, tmp_path / "streamed.json") == len(expected)
+    with open(tmp_path / "streamed.json") as file:
+        assert json.load(file) == expected
+    assert list(expected) == ["5", "2.5", "true", "null", "Some"]
+
+
+def test_iter_csv_words_not_contiguous(tmp_path):
+    (tmp_path / "words.csv").write_text("a,1,2\nb,1,2\na,2,3\n")
+    with pytest.raises(ValueError):
+        list(iter_csv_words(tmp_path / "words.csv", header=False))
+
+
+def test_data_part_array():
+    with open(fixtures_dir / "words.json") as file:
+        expected = json.load(file)
+
+    words = iter_excel_words(tests_dir.parent / "sample-data.xlsx", 100)
+    for word, intervals in words:
+        output = data_part_array(intervals)
+        assert output.tolist() == expected[word]
+        assert np.array_equal(output, np.reshape(data_part(intervals), (-1, 2)))
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_data_part_array_random():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n = rng.integers(1, 40)
+        left = rng.uniform(-1, 9, n).round(1)
+        right = left + rng.exponential(2, n).round(1)
+        intervals = list(zip(left.tolist(), right.tolist()))
+
+        output = data_part_array(intervals)
+        assert np.array_equal(output, np.reshape(data_part(intervals), (-1, 2)))
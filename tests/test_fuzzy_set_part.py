@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from eia.data_part import data_part, iter_excel_words
+from eia.fuzzy_set_part import (
+    SHAPES,
+    classify_shape,
+    fuzzy_part,
+    fuzzy_part_batch,
+    min_intersection_height,
+)
+
+tests_dir = Path(__file__).parent
+
+
+def all_pairs_height(fsl, fsr, fsc):
+    n = len(fsl)
+    hs = np.zeros(n**2)
+    for i in range(n):
+        hs[i * n + np.arange(n)] = (fsr[i] - fsl) / (fsr[i] - fsl + fsc - fsc[i])
+    index = np.argmin(hs)
+    return hs[index], index // n, index % n
+
+
+@pytest.mark.parametrize("block_size", [None, 1, 7])
+def test_min_intersection_height(block_size):
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        n = rng.integers(1, 40)
+        fsl = rng.uniform(0, 5, n).round(1)
+        fsr = fsl + rng.uniform(0.1, 3, n).round(1)
+        fsc = (fsl + fsr) / 2
+
+        output = min_intersection_height(fsl, fsr, fsc, block_size)
+        assert output == all_pairs_height(fsl, fsr, fsc)
+
+
+def test_fuzzy_part_batch():
+    words = dict(iter_excel_words(tests_dir.parent / "sample-data.xlsx", 100))
+    words = [intervals for intervals in map(data_part, words.values()) if intervals]
+    offsets = np.cumsum([0] + [len(intervals) for intervals in words])
+
+    mfs, shapes, et1fs, admissible = fuzzy_part_batch(np.concatenate(words), offsets)
+
+    assert mfs.shape == (len(words), 9)
+    for k, intervals in enumerate(words):
+        status = fuzzy_part(intervals)
+        lmf, umf = status["MF"]
+        rows = slice(offsets[k], offsets[k + 1])
+        assert SHAPES[shapes[k]] == status["shape"]
+        assert mfs[k].tolist() == [*umf, *lmf]
+        assert et1fs[rows][admissible[rows]].tolist() == [
+            list(et1fs) for et1fs in status["ET1FS"]
+        ]
+
+
+def test_fuzzy_part_batch_edge_cases():
+    # one interval, and a word without admissible embedded T1 FSs
+    mfs, shapes, _, admissible = fuzzy_part_batch(
+        [[1, 2], [0, 0.1], [9.9, 10]], [0, 1, 3]
+    )
+    half = np.sqrt(2) / 2
+    assert mfs[0].tolist() == pytest.approx(
+        [1.5 - half, 1.5, 1.5, 1.5 + half, 1.5 - half, 1.5, 1.5, 1.5 + half, 1]
+    )
+    assert np.isnan(mfs[1]).all()
+    assert admissible.tolist() == [True, False, False]
+
+    with pytest.raises(ValueError):
+        fuzzy_part_batch([[1, 2], [2, 3]], [0, 0, 2])
+    with pytest.raises(ValueError):
+        fuzzy_part_batch([[1, 2], [2, 3]], [0, 1])
+
+
+def test_fuzzy_part_batch_borderline():
+    # the means of this word lie on the line of the left-shoulder region up to
+    # rounding, where pairwise and sequential sums give different shapes; in
+    # exact arithmetic they are 4e-16 inside the left-shoulder region, which
+    # the reduceat sums of classify_shapes find but np.mean did not
+    left = [1.43, 0.22, 1.42, 0.47, 0.63, 1.24, 0.61, 0.82, 0.04]
+    left += [1.13, 0.81, 0.49, 1.18, 0.45, 0.68, 0.2, 0.6, 0.31]
+    right = [2.8499999999999996, 3.35, 2.9, 2.67, 4.5600000000000005, 5.11]
+    right += [3.65, 3.21, 1.51, 2.19, 4.7, 2.8, 2.09, 3.1300000000000003]
+    right += [3.9000000000000004, 2.85, 4.31, 0.3661042161113563]
+    intervals = np.column_stack([left, right])
+
+    status = fuzzy_part(intervals)
+    mfs, shapes, _, _ = fuzzy_part_batch(
+        np.concatenate([[[1, 2]], intervals]), [0, 1, len(intervals) + 1]
+    )
+    lmf, umf = status["MF"]
+    assert status["shape"] == "left-shoulder"
+    assert classify_shape(intervals[:, 0], intervals[:, 1]) == "left-shoulder"
+    assert SHAPES[shapes[1]] == status["shape"]
+    assert mfs[1].tolist() == [*umf, *lmf]
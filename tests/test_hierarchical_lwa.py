@@ -0,0 +1,65 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from utils.hierarchical_lwa import CriteriaTree
+from utils.linguistic_weighted_average import lwa
+
+tests_dir = Path(__file__).parent
+fixtures_dir = tests_dir / "fixtures"
+
+with open(fixtures_dir / "words_status.json") as file:
+    words_status = json.load(file)
+
+fous = [status["MF"][1] + status["MF"][0] for status in words_status.values()]
+
+
+def build_tree():
+    tree = CriteriaTree(n=3)
+    for i in range(4):
+        tree.add_leaf(f"leaf{i}", fous[i])
+    tree.add_node("left", [("leaf0", fous[10]), ("leaf1", fous[11])])
+    tree.add_node("right", [("leaf2", fous[12]), ("leaf3", fous[13])])
+    tree.add_node("root", [("left", fous[14]), ("right", fous[15])])
+    return tree
+
+
+def expected_root(leaves):
+    left = lwa([leaves[0], leaves[1]], [fous[10], fous[11]], 3)[0]
+    right = lwa([leaves[2], leaves[3]], [fous[12], fous[13]], 3)[0]
+    return lwa([left, right], [fous[14], fous[15]], 3)[0]
+
+
+@pytest.fixture(params=[None, 2], ids=["serial", "threads"])
+def executor(request):
+    if request.param is None:
+        yield None
+    else:
+        with ThreadPoolExecutor(request.param) as executor:
+            yield executor
+
+
+def test_criteria_tree(executor):
+    tree = build_tree()
+
+    assert tree.evaluate("root", executor) == pytest.approx(expected_root(fous[:4]))
+    assert tree.evaluations == 3
+
+    # Only the ancestors of the changed leaf are recomputed
+    tree.set_leaf("leaf3", fous[20])
+    assert tree.evaluate("root", executor) == pytest.approx(
+        expected_root([*fous[:3], fous[20]])
+    )
+    assert tree.evaluations == 5
+
+
+def test_criteria_tree_errors():
+    tree = build_tree()
+    with pytest.raises(ValueError):
+        tree.add_leaf("leaf0", fous[0])
+    with pytest.raises(KeyError):
+        tree.add_node("other", [("missing", fous[0])])
+    with pytest.raises(KeyError):
+        tree.set_leaf("root", fous[0])
@@ -0,0 +1,81 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import eia
+import utils
+from eia.data_part import iter_excel_words
+from eia.parallel import run_eia
+
+tests_dir = Path(__file__).parent
+root = tests_dir.parent
+
+
+def loaded_modules(code):
+    """Modules loaded by a new interpreter after running code"""
+
+    output = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys; print(list(sys.modules))"],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return set(eval(output))
+
+
+def test_package_imports_are_lazy():
+    modules = loaded_modules("import eia, utils")
+    assert "numpy" not in modules
+    assert not {name for name in modules if name.startswith(("eia.", "utils."))}
+
+
+@pytest.mark.parametrize(
+    "code", ["import eia.parallel", "from eia import encode_word", "import utils"]
+)
+def test_startup_avoids_heavy_imports(code):
+    modules = loaded_modules(code)
+    for heavy in ["openpyxl", "concurrent.futures.process", "dataclasses"]:
+        assert heavy not in modules
+
+
+def test_utils_do_not_import_eia():
+    modules = loaded_modules(
+        "import utils.caching, utils.codebook, utils.hierarchical_lwa, "
+        "utils.ranking_methods, utils.similarity_measures"
+    )
+    assert "utils.profiling" in modules
+    assert not {name for name in modules if name.split(".")[0] == "eia"}
+
+
+@pytest.mark.parametrize("package", [eia, utils])
+def test_public_names(package):
+    for name in package.__all__:
+        assert getattr(package, name) is not None
+        assert name in dir(package)
+    with pytest.raises(AttributeError):
+        package.missing
+
+
+def test_encode_json_cli(tmp_path):
+    words = dict(iter_excel_words(root / "sample-data.xlsx", 100))
+    words = {word: words[word] for word in ["Little", "Some", "Large"]}
+    words["broken"] = [[0, 1], None]
+
+    process = subprocess.run(
+        [sys.executable, "-m", "eia", "--intervals", str(tmp_path / "words.json")],
+        input=json.dumps(words),
+        cwd=root,
+        capture_output=True,
+        text=True,
+    )
+
+    intervals, words_status, errors = run_eia(words, workers=0)
+    assert process.returncode == 1
+    assert process.stderr.startswith("broken: ")
+    assert json.loads(process.stdout) == json.loads(json.dumps(words_status))
+    with open(tmp_path / "words.json") as file:
+        assert json.load(file) == json.loads(json.dumps(intervals))
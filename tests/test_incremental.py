@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from eia.data_part import data_part, data_part_array, iter_excel_words
+from eia.fuzzy_set_part import fuzzy_part
+from eia.incremental import WordEncoder
+
+tests_dir = Path(__file__).parent
+
+words = dict(iter_excel_words(tests_dir.parent / "sample-data.xlsx", 100))
+
+
+def assert_same_status(output, intervals):
+    expected = fuzzy_part(intervals)
+    assert output["shape"] == expected["shape"]
+    assert np.array_equal(
+        np.array([*output["MF"][0], *output["MF"][1]], dtype=float),
+        np.array([*expected["MF"][0], *expected["MF"][1]], dtype=float),
+    )
+    assert output["ET1FS"] == pytest.approx(expected["ET1FS"])
+
+
+@pytest.mark.parametrize("word", ["Medium", "Some", "Little", "Large"])
+def test_word_encoder(word):
+    intervals = words[word]
+    encoder = WordEncoder()
+
+    for k, interval in enumerate(intervals, 1):
+        encoder.add(interval)
+        if k % 10 == 0:
+            assert_same_status(encoder.status, data_part(intervals[:k]))
+    assert_same_status(encoder.status, data_part(intervals))
+
+    for interval in intervals[:10]:
+        encoder.remove(interval)
+    assert_same_status(encoder.status, data_part(intervals[10:]))
+
+
+def test_word_encoder_incremental_height():
+    encoder = WordEncoder(words["Medium"])
+    encoder.status
+    assert encoder.full_recompute
+
+    # A near-median answer leaves the Data Part fences in place
+    encoder.add((4, 6))
+    assert_same_status(encoder.status, data_part([*words["Medium"], (4, 6)]))
+    assert not encoder.full_recompute
+    assert encoder.incremental_updates == 1
+    assert encoder.data_part_runs == 1
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_word_encoder_random():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        left = rng.normal(4, 1, 60).round(2)
+        right = left + rng.exponential(2, 60).round(2)
+        intervals = list(zip(left.tolist(), right.tolist()))
+        encoder = WordEncoder()
+        added = []
+
+        for interval in intervals:
+            if encoder.add(interval):
+                added.append(interval)
+            if added and rng.random() < 0.1:
+                interval = added[rng.integers(len(added))]
+                encoder.remove(interval)
+                added.remove(interval)
+            kept = data_part_array(added)
+            assert np.array_equal(encoder.intervals, kept)
+            if encoder.status is not None:
+                assert_same_status(encoder.status, data_part(added))
+        assert encoder.data_part_runs < len(intervals)
+
+
+def test_word_encoder_bad_data():
+    encoder = WordEncoder()
+    assert not encoder.add((5, 4))
+    assert len(encoder) == 0
+    assert encoder.status is None
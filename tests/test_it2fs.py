@@ -0,0 +1,103 @@
+import json
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from utils.caching import FOUCache
+from utils.centroid_it2fs import centroid_it2, centroid_it2_batch, mg_it2
+from utils.hierarchical_lwa import CriteriaTree
+from utils.it2fs import IT2FS
+from utils.linguistic_weighted_average import lwa, lwa_batch
+from utils.ranking_methods import Ranker, centroid_rank
+from utils.similarity_measures import JaccardIndex, jaccard, jaccard_batch
+
+tests_dir = Path(__file__).parent
+fixtures_dir = tests_dir / "fixtures"
+
+with open(fixtures_dir / "words_status.json") as file:
+    words_status = json.load(file)
+
+mfs = [status["MF"] for status in words_status.values()]
+fous = [mf[1] + mf[0] for mf in mfs]
+
+
+def test_layouts():
+    fs = IT2FS(mfs[0])
+
+    assert IT2FS(fous[0]) == fs == IT2FS(fs)
+    assert IT2FS(fous[0][:8]) == IT2FS(fous[0][:8] + [1])
+    assert list(fs) == fous[0] and len(fs) == 9 and fs[:4] == tuple(fous[0][:4])
+    assert fs.mf == mfs[0]
+    assert fs.umf == tuple(mfs[0][1]) and fs.lmf == tuple(mfs[0][0])
+    assert fs.height == mfs[0][0][-1]
+    assert fs.support == (fous[0][0], fous[0][3])
+    with pytest.raises(ValueError):
+        IT2FS([1, 2, 3])
+
+
+def test_immutable_and_hashable():
+    fs = IT2FS(fous[0])
+
+    with pytest.raises(AttributeError):
+        fs.lmf = (0, 0, 0, 0, 1)
+    with pytest.raises(AttributeError):
+        fs.extra = 1
+    array = np.asarray(fs)
+    assert not array.flags.writeable
+    assert np.shares_memory(array, np.asarray(fs))
+
+    zero = [0.0, 0, 1, 2, 0, 0, 1, 1.5, 0.5]
+    negative_zero = [-0.0, 0, 1, 2, 0, 0, 1, 1.5, 0.5]
+    assert {IT2FS(zero): 1}[IT2FS(negative_zero)] == 1
+    assert IT2FS(fous[0]) != IT2FS(fous[1])
+    assert pickle.loads(pickle.dumps(fs)) == fs
+
+
+def test_cached_quantities():
+    fs = IT2FS(mfs[0])
+
+    assert fs.centroid() == centroid_it2(mfs[0])
+    assert fs.centroid(exact=True) == centroid_it2(mfs[0], exact=True)
+    assert fs.centroid_interval == tuple(centroid_it2(mfs[0])[:2])
+    # centroid_it2 returns the centroids cached with the IT2 FS
+    assert centroid_it2(fs) == fs.centroid()
+    assert centroid_it2(fs, exact=True) == fs.centroid(exact=True)
+    assert len(fs._cache) == 2
+
+    x, lmf, umf = fs.discretize(50)
+    assert fs.discretize(50)[0] is x
+    assert x[0] == fous[0][0] and x[-1] == fous[0][3]
+    expected_lmf, expected_umf = mg_it2(x, fous[0])
+    assert lmf.tolist() == expected_lmf.tolist()
+    assert umf.tolist() == expected_umf.tolist()
+    assert not umf.flags.writeable
+    assert fs.discretize(50, 0, 10)[0][-1] == 10
+
+
+def test_utils_accept_it2fs():
+    fss = [IT2FS(mf) for mf in mfs]
+
+    assert centroid_it2(fss[0]) == centroid_it2(mfs[0])
+    assert jaccard(fss[0], fss[1]) == jaccard(fous[0], fous[1])
+    assert lwa(fss[:3], fss[3:6], 3) == lwa(fous[:3], fous[3:6], 3)
+    assert centroid_rank(fss).tolist() == centroid_rank(mfs).tolist()
+    assert Ranker().rank(fss).tolist() == Ranker().rank(mfs).tolist()
+    assert np.array_equal(centroid_it2_batch(fss), centroid_it2_batch(fous))
+    assert np.array_equal(
+        jaccard_batch(fss[:5], fss[5:10]), jaccard_batch(fous[:5], fous[5:10])
+    )
+    assert np.array_equal(
+        lwa_batch([fss[:3]], fss[3:6])[0], lwa_batch([fous[:3]], fous[3:6])[0]
+    )
+    assert JaccardIndex(list(words_status), fss).query(fss[0], k=3) == JaccardIndex(
+        list(words_status), fous
+    ).query(fous[0], k=3)
+    assert FOUCache().key(fss[0]) == FOUCache().key(mfs[0])
+
+    tree = CriteriaTree()
+    tree.add_leaf("a", fss[0])
+    tree.add_leaf("b", fss[1])
+    tree.add_node("root", [("a", fss[2]), ("b", fss[3])])
+    assert tree.evaluate("root") == lwa(fous[:2], fous[2:4])[0]
@@ -0,0 +1,52 @@
+import copy
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from utils.linguistic_weighted_average import fwa, fwa_batch, lwa, lwa_batch
+
+tests_dir = Path(__file__).parent
+fixtures_dir = tests_dir / "fixtures"
+
+with open(fixtures_dir / "words_status.json") as file:
+    words_status = json.load(file)
+
+fous = [status["MF"][1] + status["MF"][0] for status in words_status.values()]
+
+
+def test_fwa_does_not_modify_inputs():
+    x = [[1, 2, 3, 4], [2, 3, 4, 5]]
+    w = [[0.1, 0.2, 0.3, 0.4], [0.5, 0.6, 0.7, 0.8]]
+    fwa(x, w)
+    assert x == [[1, 2, 3, 4], [2, 3, 4, 5]]
+    assert w == [[0.1, 0.2, 0.3, 0.4], [0.5, 0.6, 0.7, 0.8]]
+
+
+@pytest.mark.parametrize("n", [2, 3, 10])
+def test_fwa_batch(n):
+    x = [fou[:4] for fou in fous[:6]]
+    w = [fou[4:] for fou in fous[6:12]]
+    expected = fwa(x, w, n)
+
+    output = fwa_batch(x, w, n)
+
+    for out, exp in zip(output, expected):
+        assert out == pytest.approx(exp)
+
+
+@pytest.mark.parametrize("n", [2, 5])
+def test_lwa_batch(n):
+    alternatives = [fous[i : i + 4] for i in range(0, 28, 4)]
+    weights = fous[-4:]
+    expected = [lwa(copy.deepcopy(x), copy.deepcopy(weights), n) for x in alternatives]
+    before = copy.deepcopy(alternatives)
+
+    output = lwa_batch(alternatives, weights, n)
+
+    assert alternatives == before
+    assert output[0].shape == (len(alternatives), 9)
+    for i, exp in enumerate(expected):
+        for out, e in zip(output, exp):
+            assert out[i] == pytest.approx(np.asarray(e))
@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from eia.data_part import iter_excel_words
+from eia.parallel import run_eia
+
+tests_dir = Path(__file__).parent
+fixtures_dir = tests_dir / "fixtures"
+
+words = dict(iter_excel_words(tests_dir.parent / "sample-data.xlsx", 100))
+
+
+@pytest.mark.parametrize("workers, chunksize", [(0, 1), (2, 1), (2, 5)])
+def test_run_eia(workers, chunksize):
+    with open(fixtures_dir / "words.json") as file:
+        expected_intervals = json.load(file)
+    with open(fixtures_dir / "words_status.json") as file:
+        expected_status = json.load(file)
+
+    intervals, words_status, errors = run_eia(words, workers, chunksize)
+
+    assert not errors
+    assert json.loads(json.dumps(intervals)) == expected_intervals
+    assert list(words_status) == list(expected_status)
+    for word, status in words_status.items():
+        assert status["shape"] == expected_status[word]["shape"]
+        assert [*status["MF"][0], *status["MF"][1]] == pytest.approx(
+            [*expected_status[word]["MF"][0], *expected_status[word]["MF"][1]]
+        )
+
+
+def test_run_eia_errors():
+    degenerate = {"fine": words["Little"], "broken": [(0, 1), None], "empty": []}
+
+    intervals, words_status, errors = run_eia(degenerate, workers=2)
+
+    assert list(words_status) == ["fine"]
+    assert list(errors) == ["broken"]
+    assert intervals["empty"] == []
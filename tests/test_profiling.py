@@ -0,0 +1,100 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from eia.data_part import data_part, data_part_array, iter_excel_words
+from eia.parallel import run_eia
+from utils import profiling
+from utils.centroid_it2fs import centroid_it2, centroid_it2_batch
+
+tests_dir = Path(__file__).parent
+fixtures_dir = tests_dir / "fixtures"
+
+words = dict(iter_excel_words(tests_dir.parent / "sample-data.xlsx", 100))
+
+stages = [
+    "data_part.bad_data",
+    "data_part.outliers",
+    "data_part.tolerance_limits",
+    "data_part.reasonable_intervals",
+]
+
+
+@pytest.mark.parametrize("function", [data_part, data_part_array])
+def test_data_part_stages(function):
+    intervals = words["Some"]
+
+    with profiling.Profile() as profile:
+        result = function(intervals)
+
+    assert list(profile.stages) == stages
+    dropped = sum(stage["dropped"] for stage in profile.stages.values())
+    assert dropped == len(intervals) - len(result)
+    assert all(stage["calls"] == 1 for stage in profile.stages.values())
+
+
+def test_same_dropped_counts():
+    with profiling.Profile() as lists:
+        for intervals in words.values():
+            data_part(intervals)
+    with profiling.Profile() as arrays:
+        for intervals in words.values():
+            data_part_array(intervals)
+
+    for name in stages:
+        assert lists.stages[name]["dropped"] == arrays.stages[name]["dropped"]
+
+
+def test_disabled():
+    with profiling.Profile() as profile:
+        pass
+    data_part(words["Some"])
+
+    assert profiling.active() is None
+    assert profile.to_dict() == {"stages": {}, "counters": {}, "words": {}}
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_run_eia(workers):
+    with profiling.Profile() as profile:
+        run_eia(words, workers=workers)
+
+    assert set(profile.words) == set(words)
+    assert profile.stages["data_part.bad_data"]["calls"] == len(words)
+    assert "fuzzy_set_part.height" in profile.stages
+    assert "fuzzy_set_part.inadmissible" in profile.counters
+
+
+def test_ekm_counters():
+    with open(fixtures_dir / "words_status.json") as file:
+        words_status = json.load(file)
+    mfs = [status["MF"] for status in words_status.values()]
+    fous = [mf[1] + mf[0] for mf in mfs]
+
+    with profiling.Profile() as profile:
+        for mf in mfs:
+            centroid_it2(mf)
+        centroid_it2_batch(fous)
+
+    assert profile.counters["ekm.calls"] == profile.stages["centroid.ekm"]["calls"] - 2
+    assert profile.counters["ekm.iterations"] > 0
+    assert profile.counters["ekm_batch.problems"] == 2 * len(fous)
+
+
+def test_export(tmp_path):
+    events = []
+    with profiling.Profile(callback=events.append) as profile:
+        profiling.word("Some", data_part, words["Some"])
+        profiling.count("answers", 3)
+
+    path = tmp_path / "profile.json"
+    assert json.loads(profile.to_json(path)) == json.loads(path.read_text())
+    assert json.loads(path.read_text())["counters"] == {"answers": 3}
+    assert [event["event"] for event in events] == ["stage"] * 4 + ["word", "count"]
+
+    merged = profiling.Profile()
+    merged.merge(profile)
+    merged.merge(profile.to_dict())
+    assert merged.counters == {"answers": 6}
+    assert merged.stages["data_part.outliers"]["calls"] == 2
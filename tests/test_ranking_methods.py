@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from utils.centroid_it2fs import centroid_it2
+from utils.ranking_methods import Ranker, centroid_rank
+
+tests_dir = Path(__file__).parent
+fixtures_dir = tests_dir / "fixtures"
+
+with open(fixtures_dir / "words_status.json") as file:
+    words_status = json.load(file)
+
+mfs = [status["MF"] for status in words_status.values()]
+
+
+def test_ranker_matches_centroid_rank():
+    ranker = Ranker()
+    assert ranker.rank(mfs).tolist() == centroid_rank(mfs).tolist()
+    assert ranker.scores(mfs) == pytest.approx([centroid_it2(mf)[-1] for mf in mfs])
+
+
+def test_ranker_cache():
+    ranker = Ranker(maxsize=10)
+    repeated = mfs[:5] * 100
+
+    ranker.rank(repeated)
+    assert (ranker.hits, ranker.misses) == (0, 5)
+    ranker.rank(repeated)
+    assert (ranker.hits, ranker.misses) == (5, 5)
+
+    ranker.rank(mfs)
+    assert len(ranker._cache) == 10
+
+
+def test_ranker_methods():
+    ranker = Ranker()
+    fous = [[*umf, *lmf] for lmf, umf in mfs]
+
+    # The centroid of a symmetric T1 FS is its middle
+    assert ranker.scores([[1, 2, 4, 5, 2, 3, 3, 4, 0.5]], "mean") == pytest.approx([3])
+    for method in ["wu-mendel", "exact-centroid", "mean"]:
+        ranks = ranker.rank(fous, method)
+        assert sorted(ranks.tolist()) == list(range(len(fous)))
+    assert np.array_equal(ranker.rank(fous, "wu-mendel"), ranker.rank(mfs))
+    with pytest.raises(ValueError):
+        ranker.rank(fous, "unknown")
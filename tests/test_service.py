@@ -0,0 +1,109 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from eia.data_part import iter_excel_words
+from eia.parallel import encode_word
+from utils.centroid_it2fs import centroid_it2
+from utils.linguistic_weighted_average import lwa
+from utils.ranking_methods import centroid_rank
+from utils.service import Client, Service
+from utils.similarity_measures import jaccard
+
+tests_dir = Path(__file__).parent
+fixtures_dir = tests_dir / "fixtures"
+
+with open(fixtures_dir / "words_status.json") as file:
+    words_status = json.load(file)
+
+mfs = [status["MF"] for status in words_status.values()]
+fous = [status["MF"][1] + status["MF"][0] for status in words_status.values()]
+
+
+def test_operations():
+    async def run():
+        service = Service(workers=0, max_batch=8)
+        centroids = await asyncio.gather(*(service.centroid(mf) for mf in mfs))
+        ranks = await asyncio.gather(
+            service.rank(mfs), service.rank(fous[:5]), service.rank(fous, "mean")
+        )
+        similarity = await service.call("jaccard", a=fous[0], b=mfs[1])
+        lwas = await asyncio.gather(
+            service.lwa(fous[:3], fous[3:6]), service.lwa(fous[6:9], fous[3:6], n=3)
+        )
+        with pytest.raises(ValueError):
+            await service.call("close")
+        with pytest.raises(ValueError):
+            await service.centroid([1, 2, 3])
+        return centroids, ranks, similarity, lwas
+
+    centroids, ranks, similarity, lwas = asyncio.run(run())
+
+    for mf, centroid in zip(mfs, centroids):
+        assert centroid == pytest.approx(centroid_it2(mf))
+    assert ranks[0] == centroid_rank(mfs).tolist()
+    assert ranks[1] == centroid_rank(mfs[:5]).tolist()
+    assert sorted(ranks[2]) == list(range(len(fous)))
+    assert similarity == pytest.approx(jaccard(fous[0], fous[1]))
+    assert lwas[0][0] == pytest.approx(lwa(fous[:3], fous[3:6])[0])
+    assert lwas[1][0] == pytest.approx(lwa(fous[6:9], fous[3:6], n=3)[0])
+
+
+def test_timeout():
+    async def run():
+        service = Service(workers=0, delay=1, timeout=0.01)
+        with pytest.raises(asyncio.TimeoutError):
+            await service.call("centroid", it2fs=mfs[0])
+
+    asyncio.run(run())
+
+
+def test_unix_socket(tmp_path):
+    words = dict(iter_excel_words(tests_dir.parent / "sample-data.xlsx", 100))
+    path = str(tmp_path / "service.sock")
+
+    async def run():
+        service = Service(workers=0, max_pending=4)
+        server = await service.serve(path)
+        async with server:
+            client = await Client.connect(path)
+            encoded = await client.call("encode", intervals=words["Some"])
+            centroids = await asyncio.gather(
+                *(client.call("centroid", it2fs=mf) for mf in mfs)
+            )
+            with pytest.raises(RuntimeError, match="unknown operation"):
+                await client.call("serve")
+            await client.close()
+        return encoded, centroids
+
+    encoded, centroids = asyncio.run(run())
+
+    intervals, status = encode_word(words["Some"])
+    assert encoded["intervals"] == json.loads(json.dumps(intervals))
+    assert encoded["status"]["MF"] == json.loads(json.dumps(status["MF"]))
+    for mf, centroid in zip(mfs, centroids):
+        assert centroid == pytest.approx(centroid_it2(mf))
+
+
+def test_process_pool():
+    async def run():
+        service = Service(workers=1)
+        server = await service.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            async with server:
+                client = await Client.connect(port=port)
+                results = await asyncio.gather(
+                    client.call("jaccard", a=fous[0], b=fous[1]),
+                    client.call("jaccard", a=fous[2], b=fous[2]),
+                )
+                await client.close()
+        finally:
+            service.close()
+        return results
+
+    results = asyncio.run(run())
+
+    assert results == pytest.approx([jaccard(fous[0], fous[1]), 1])
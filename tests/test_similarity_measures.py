@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from utils.similarity_measures import JaccardIndex, jaccard, jaccard_matrix
+
+tests_dir = Path(__file__).parent
+fixtures_dir = tests_dir / "fixtures"
+
+with open(fixtures_dir / "words_status.json") as file:
+    words_status = json.load(file)
+
+fous = [status["MF"][1] + status["MF"][0] for status in words_status.values()]
+
+
+def test_jaccard_identical():
+    for fou in fous:
+        assert jaccard(fou, fou) == pytest.approx(1)
+
+
+@pytest.mark.parametrize("block_size", [1, 5, 64])
+def test_jaccard_matrix(block_size):
+    output = jaccard_matrix(fous, block_size=block_size)
+
+    assert output.shape == (len(fous), len(fous))
+    assert np.array_equal(output, output.T)
+    assert np.diag(output) == pytest.approx(1)
+
+    # Pairs spanning the whole universe are discretized the same way by jaccard
+    for i, a in enumerate(fous):
+        for j, b in enumerate(fous):
+            if min(a[0], b[0]) == 0 and max(a[3], b[3]) == 10:
+                assert output[i, j] == pytest.approx(jaccard(a, b))
+
+
+def test_jaccard_index_query():
+    index = JaccardIndex.from_words_status(words_status)
+    similarities = jaccard_matrix(fous)
+    words = list(words_status)
+
+    for fou, row in zip(fous, similarities):
+        bounds, *_ = index.bounds(fou)
+        assert np.all(bounds >= row - 1e-12)
+
+        output = index.query(fou, k=3)
+        expected = np.lexsort((np.arange(len(row)), -row))[:3]
+        assert [word for word, _ in output] == [words[i] for i in expected]
+        assert [s for _, s in output] == pytest.approx(row[expected])
+
+
+def test_jaccard_index_from_json():
+    index = JaccardIndex.from_json(fixtures_dir / "words_status.json")
+    assert len(index) == len(words_status)
+    assert index.query(fous[0], k=0) == []
+    assert len(index.query(fous[0], k=100)) == len(words_status)
+
+
+def test_jaccard_empty_codebook():
+    assert jaccard_matrix(np.zeros((0, 9))).shape == (0, 0)
+
+    index = JaccardIndex([], np.zeros((0, 9)))
+    assert len(index) == 0
+    assert index.query(fous[0], k=3) == []
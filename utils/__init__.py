@@ -0,0 +1,53 @@
+"""Tools and measures for IT2 FSs
+
+The names below are imported from their modules on first access, so that
+`import utils` stays cheap and a job only pays for the modules it uses.
+"""
+
+import importlib
+
+_exports = {
+    'IT2FS': 'utils.it2fs',
+    'SHAPES': 'utils.it2fs',
+    'mg': 'utils.centroid_it2fs',
+    'mg_array': 'utils.centroid_it2fs',
+    'ekm': 'utils.centroid_it2fs',
+    'ekm_batch': 'utils.centroid_it2fs',
+    'centroid_it2': 'utils.centroid_it2fs',
+    'centroid_it2_batch': 'utils.centroid_it2fs',
+    'centroid_it2_exact': 'utils.centroid_it2fs',
+    'fwa': 'utils.linguistic_weighted_average',
+    'lwa': 'utils.linguistic_weighted_average',
+    'fwa_batch': 'utils.linguistic_weighted_average',
+    'lwa_batch': 'utils.linguistic_weighted_average',
+    'jaccard': 'utils.similarity_measures',
+    'jaccard_batch': 'utils.similarity_measures',
+    'jaccard_matrix': 'utils.similarity_measures',
+    'JaccardIndex': 'utils.similarity_measures',
+    'centroid_rank': 'utils.ranking_methods',
+    'Ranker': 'utils.ranking_methods',
+    'FOUCache': 'utils.caching',
+    'fou_key': 'utils.caching',
+    'Codebook': 'utils.codebook',
+    'LazyCodebook': 'utils.codebook',
+    'write_codebook': 'utils.codebook',
+    'CriteriaTree': 'utils.hierarchical_lwa',
+    'Profile': 'utils.profiling',
+    'Service': 'utils.service',
+    'Client': 'utils.service',
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_exports})
@@ -0,0 +1,137 @@
+from collections import OrderedDict
+import threading
+import time
+
+from utils.centroid_it2fs import centroid_it2
+from utils.linguistic_weighted_average import lwa
+from utils.similarity_measures import jaccard
+
+_missing = object()
+
+
+def fou_key(it2fs, decimals=9):
+    """Canonical key of an IT2 FS
+    
+    it2fs: either [[e, f, g, i, h], [a, b, c, d]] like centroid_it2 or the
+        nine parameters [a, b, c, d, e, f, g, i, h]; eight parameters have an
+        LMF height of 1
+    decimals: the parameters are rounded to this many decimals, so that FOUs
+        that only differ by floating point noise share a key
+    
+    Both layouts give the same key, and -0.0 is the same as 0.0.
+    """
+    
+    if len(it2fs) == 2:
+        lower, upper = it2fs
+        params = [*upper, *lower]
+    else:
+        params = list(it2fs)
+    if len(params) == 8:
+        params.append(1)
+    # adding 0.0 turns -0.0 into 0.0
+    return tuple(round(float(p), decimals) + 0.0 for p in params)
+
+
+class FOUCache:
+    """A thread-safe LRU cache of results computed from IT2 FSs.
+    
+    The cache is opt-in: the functions of the utils package never use it by
+    themselves, and its centroid_it2, jaccard and lwa methods are drop-in
+    replacements for them that look up the result first. Results are keyed by
+    fou_key, so the same word gives a hit whatever its layout.
+    
+    Several threads can share one cache. The computation of a missing result
+    is done outside the lock, so two threads may both compute it the first time.
+    """
+    
+    def __init__(self, maxsize=10_000, ttl=None, decimals=9, timer=time.monotonic):
+        """maxsize: maximum number of results, the least recently used are evicted first
+        ttl: time to live of a result in seconds, None to keep them until evicted
+        decimals: rounding of the FOU parameters in the keys
+        timer: clock used for the time to live
+        """
+        
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.decimals = decimals
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # key -> (value, expiry time)
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def key(self, it2fs):
+        return fou_key(it2fs, self.decimals)
+    
+    def get(self, key, default=None):
+        """Cached value of key, or default if it is missing or expired"""
+        
+        with self._lock:
+            item = self._data.get(key, _missing)
+            if item is not _missing and item[1] is not None and item[1] <= self.timer():
+                del self._data[key]
+                item = _missing
+            if item is _missing:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+    
+    def put(self, key, value):
+        expiry = None if self.ttl is None else self.timer() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expiry)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def memoize(self, key, function, *args, **kwargs):
+        """Cached value of key, computed by function(*args, **kwargs) if missing"""
+        
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = function(*args, **kwargs)
+            self.put(key, value)
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def info(self):
+        """Hit and miss counters and the current size"""
+        
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._data), 'maxsize': self.maxsize}
+    
+    def centroid_it2(self, it2fs, num=100, exact=False):
+        """Cached centroid_it2; it2fs can also be given by nine parameters
+        
+        The results are computed from the rounded parameters of the key, and
+        so only depend on it, in this method as in the others.
+        """
+        
+        fou = self.key(it2fs)
+        key = ('centroid_it2', fou, num, exact)
+        return list(self.memoize(key, centroid_it2, [list(fou[4:]), list(fou[:4])], num, exact))
+    
+    def jaccard(self, a, b):
+        """Cached jaccard, which is symmetric in a and b; they can also be
+        given like centroid_it2"""
+        
+        a, b = sorted([self.key(a), self.key(b)])
+        return self.memoize(('jaccard', a, b), jaccard, a, b)
+    
+    def lwa(self, x, w, n=2):
+        """Cached lwa; the IT2 FSs can also be given like centroid_it2"""
+        
+        key = ('lwa', tuple(map(self.key, x)), tuple(map(self.key, w)), n)
+        result = self.memoize(key, lwa, [list(fs) for fs in key[1]], [list(fs) for fs in key[2]], n)
+        return [list(values) for values in result]
@@ -1,5 +1,73 @@
+from utils import profiling
+from utils.it2fs import IT2FS
 import numpy as np
-import itertools
+
+def mg_array(x, xmf, umf=(0, 1, 1, 0)):
+    """Vectorized membership grades of x on one or many piecewise-linear T1 FSs
+    
+    x: (M,) array of x values, or (N, M) to use different x values for each T1 FS
+    xmf: (K,) x parameters of the membership function, or (N, K) for N of them
+    umf: u parameters of the membership function(s), either (K,) or (N, K)
+    
+    Returns an (M,) array for a single T1 FS and an (N, M) array otherwise.
+    Breakpoints are sorted and points on or outside the support get 0, as in mg.
+    """
+    
+    x = np.asarray(x, dtype=float)
+    xmf = np.asarray(xmf, dtype=float)
+    umf = np.asarray(umf, dtype=float)
+    
+    if x.ndim == 1 and xmf.ndim == 1 and umf.ndim == 1:
+        # single T1 FS: breakpoints are found with a binary search
+        order = np.lexsort((umf, xmf))
+        xmf = xmf[order]
+        umf = umf[order]
+        left = np.searchsorted(xmf, x, side='left') - 1
+        left = np.clip(left, 0, len(xmf) - 2)
+        x_left, x_right = xmf[left], xmf[left + 1]
+        u_left, u_right = umf[left], umf[left + 1]
+        inside = (x > xmf[0]) & (x < xmf[-1])
+    else:
+        # only the 2-D operands have a number of T1 FSs, possibly 0
+        n, = np.broadcast_shapes(*(a.shape[:1] for a in (x, xmf, umf) if a.ndim == 2))
+        x = np.broadcast_to(np.atleast_2d(x), (n, x.shape[-1]))
+        xmf = np.broadcast_to(np.atleast_2d(xmf), (n, xmf.shape[-1]))
+        umf = np.broadcast_to(np.atleast_2d(umf), xmf.shape)
+        
+        order = np.lexsort((umf, xmf), axis=-1)
+        xmf = np.take_along_axis(xmf, order, axis=-1)
+        umf = np.take_along_axis(umf, order, axis=-1)
+        
+        # index of the last breakpoint strictly to the left of each x
+        left = np.count_nonzero(xmf[:, None, :] < x[:, :, None], axis=-1) - 1
+        left = np.clip(left, 0, xmf.shape[-1] - 2)
+        x_left = np.take_along_axis(xmf, left, axis=-1)
+        x_right = np.take_along_axis(xmf, left + 1, axis=-1)
+        u_left = np.take_along_axis(umf, left, axis=-1)
+        u_right = np.take_along_axis(umf, left + 1, axis=-1)
+        inside = (x > xmf[:, :1]) & (x < xmf[:, -1:])
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        u = u_left + (u_right - u_left) * (x - x_left) / (x_right - x_left)
+    return np.where(inside, u, 0.0)
+
+
+def mg_it2(x, it2fss):
+    """Vectorized membership grades of x on the LMFs and UMFs of IT2 FSs
+    
+    x: (M,) array of x values, or (N, M) to use different x values for each FOU
+    it2fss: (9,) or (N, 9) IT2 FSs in the [a, b, c, d, e, f, g, i, h] layout
+    
+    Returns the LMF and UMF membership grades, each shaped like mg_array's output.
+    """
+    
+    fous = np.asarray(it2fss, dtype=float)
+    height = fous[..., 8:]
+    zeros = np.zeros_like(height)
+    lmf = mg_array(x, fous[..., 4:8], np.concatenate([zeros, height, height, zeros], axis=-1))
+    umf = mg_array(x, fous[..., :4])
+    return lmf, umf
+
 
 def mg(x, xmf, umf=[0, 1, 1, 0]):
     """Function to compute the membership grades of each x on a T1 FS
@@ -9,114 +77,352 @@ def mg(x, xmf, umf=[0, 1, 1, 0]):
     umf: u parameters of the membership function
     """
     
-    items = [item for item in sorted(zip(xmf, umf))]
-    xmf = [i[0] for i in items]
-    umf = [i[1] for i in items]
-
-    u = [None] * len(x)  # membership grade of x
-    for i, p in enumerate(x):
-        if p <= xmf[0] or p >= xmf[-1]:
-            u[i] = 0
-        else:
-            x_mf = np.array(xmf)
-            left = np.nonzero(x_mf < p)[0][-1]
-            right = left + 1
-            u[i] = umf[left] + (umf[right] - umf[left]) * (p - xmf[left]) / (xmf[right] - xmf[left])
-        
-    return u
+    return mg_array(x, xmf, umf).tolist()
    
 
-def ekm(x_point, w_lower, w_upper, max_flag):
+def ekm(x_point, w_lower, w_upper, max_flag, start=None, full_output=False):
     """Implementation of the Enhanced KM algorithm
     w_lower: lower membership values for each x
     w_upper: upper membership values for each x
     max_flag: 1 to output the maximum; -1 to output the minimum
+    start: initial guess of the switch point, e.g. the result of a similar
+        problem; the EKM initialization is used by default
+    full_output: also return the switch index and the number of iterations,
+        which are None for the inputs answered without iterating
     """
     
+    y = None
     if max(w_upper) == 0 or max(x_point) == 0:
-        return 0
-    
-    if max(w_lower) == 0:
+        y = 0
+    elif max(w_lower) == 0:
         if max_flag > 0:
-            return max(x_point)
+            y = max(x_point)
         else:
-            return min(x_point)
-        
-    if len(x_point) == 1:
-        return x_point[0]
+            y = min(x_point)
+    elif len(x_point) == 1:
+        y = x_point[0]
+    if y is not None:
+        return (y, None, None) if full_output else y
     
+    x_point = np.asarray(x_point, dtype=float)
+    w_lower = np.asarray(w_lower, dtype=float)
+    w_upper = np.asarray(w_upper, dtype=float)
     
     # removing items with 0 upper value
-    zero_filtered = [x if x != 0 else None for x in w_upper]
-    selectors = [x is not None for x in zero_filtered]
-    x_point = list(itertools.compress(x_point, selectors))
-    w_lower = list(itertools.compress(w_lower, selectors))
-    w_upper = list(itertools.compress(w_upper, selectors))
+    selectors = w_upper != 0
+    x_point = x_point[selectors]
+    w_lower = w_lower[selectors]
+    w_upper = w_upper[selectors]
     
+    order = np.lexsort((w_upper, w_lower, x_point))
+    x_point = x_point[order]
+    w_lower = w_lower[order]
+    w_upper = w_upper[order]
     
     # combine zero Xs
-    items = [item for item in sorted(zip(x_point, w_lower, w_upper))]
-    x_point = [x[0] for x in items]
+    zeros = x_point == 0
+    first = np.argmax(zeros)
+    if zeros[first] and first < len(x_point) - 1:
+        x_point = np.concatenate([x_point[:first], [0], x_point[~zeros][first:]])
+        w_lower = np.concatenate([w_lower[:first], [w_lower[zeros].sum()], w_lower[~zeros][first:]])
+        w_upper = np.concatenate([w_upper[:first], [w_upper[zeros].sum()], w_upper[~zeros][first:]])
     
-    if 0 in x_point and (len(x_point) - x_point.index(0) - 1) > 0:
-        lower_sum = sum([x[1] for x in items if x[0] == 0])
-        upper_sum = sum([x[2] for x in items if x[0] == 0])
-        items = [x for x in items if x[0] != 0]
-        items.insert(0, (0, lower_sum, upper_sum))
+    k0 = None if start is None else np.searchsorted(x_point, start, side='right') - 1
+    result = ekm_solve(x_point, w_lower, w_upper, max_flag, k0)
+    return result if full_output else result[0]
+
+
+def ekm_solve(x_point, w_lower, w_upper, max_flag, k0=None):
+    """Enhanced KM iterations on presorted arrays
     
-    # Starting the KM algorithm
-    x_point = [x[0] for x in items]
-    w_lower = [x[1] for x in items]
-    w_upper = [x[2] for x in items]
+    x_point: (M,) array of x values in ascending order
+    w_lower, w_upper: (M,) arrays of lower and upper membership values, with
+        positive sums on both sides of any switch point
+    max_flag: 1 to output the maximum; -1 to output the minimum
+    k0: initial switch index, the first k0 + 1 points take the upper (minimum)
+        or the lower (maximum) membership values; the EKM initialization
+        ly // 2.4 or ly // 1.7 is used by default
+    
+    The weighted average for any switch index comes from prefix sums computed
+    once, so an iteration is a binary search and a few scalar operations.
+    
+    Returns y, the converged switch index and the number of iterations.
+    """
     
     ly = len(x_point)
     if max_flag < 0:
-        k = int(ly // 2.4)
-        temp = w_upper[:k + 1] + w_lower[k + 1:]
+        head, tail = w_upper, w_lower
+        k = int(ly // 2.4) if k0 is None else int(k0)
     else:
-        k = int(ly // 1.7)
-        temp = w_lower[:k + 1] + w_upper[k + 1:]
-       
-    a = sum(np.array(x_point) * temp)
-    b = sum(temp)
-    y = a / b
-    # rounded_xpoints = [round(x, 9) for x in x_point]
-    k_new = np.nonzero(np.array(x_point) > y)[0] - 1
-    
-    if k_new.size != 0:
-        k_new = k_new[0]
-        
-    while k != k_new:
-        mink = min(k, k_new)
-        maxk = max(k, k_new)
-        temp = np.array(w_upper[mink + 1:maxk + 1]) - w_lower[mink + 1:maxk + 1]
-        b = b - np.sign(k_new - k) * np.sign(max_flag) * sum(temp)
-        a = a - np.sign(k_new - k) * np.sign(max_flag) * sum(temp * x_point[mink + 1:maxk + 1])
-        y = a / b
+        head, tail = w_lower, w_upper
+        k = int(ly // 1.7) if k0 is None else int(k0)
+    k = min(max(k, 0), ly - 1)
+    
+    a_head = np.cumsum(x_point * head)
+    b_head = np.cumsum(head)
+    a_tail = np.cumsum(x_point * tail)
+    b_tail = np.cumsum(tail)
+    a_total = a_tail[-1]
+    b_total = b_tail[-1]
+    
+    # KM always converges in at most ly iterations
+    for iterations in range(ly + 1):
+        y = (a_head[k] + a_total - a_tail[k]) / (b_head[k] + b_total - b_tail[k])
+        k_new = int(np.searchsorted(x_point, y, side='right')) - 1
+        # no x is above y when it is already the largest x, so it has converged;
+        # y is never below the smallest x, except by rounding
+        if k_new == ly - 1:
+            break
+        k_new = max(k_new, 0)
+        if k_new == k:
+            break
         k = k_new
-        k_new = np.nonzero(np.array(x_point) > y)[0] - 1
-        if k_new.size != 0:
-            k_new = k_new[0]
-            
-    return y
+    
+    profiling.count('ekm.calls')
+    profiling.count('ekm.iterations', iterations)
+    return y, k, iterations
+
+
+def _centroid(x, u):
+    """Centroids of T1 FSs given by their grades u at x, along the last axis"""
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (x * u).sum(axis=-1) / u.sum(axis=-1)
        
           
-def centroid_it2(it2fs): 
+def centroid_it2(it2fs, num=100, exact=False):
     """To compute the centroid of an IT2 FS
-    which is defined by nine parameters ([e, f, g, i, h], [a, b, c, d])     
+    which is defined by nine parameters ([e, f, g, i, h], [a, b, c, d])
+    
+    num: number of points used to discretize the FOU
+    exact: compute the centroid on the continuous trapezoids instead of a
+        discretization (see centroid_it2_exact); num is then ignored
+    
+    An IT2FS is also accepted, and keeps its centroids for the next calls.
     """
     
+    if isinstance(it2fs, IT2FS):
+        return it2fs.centroid(num, exact)
+    
+    if exact:
+        lower, upper = it2fs
+        return centroid_it2_exact([[*upper, *lower]])[0].tolist()
+    
     lower = it2fs[0]
     upper = it2fs[1]
-    xs = list(np.linspace(upper[0], upper[3], num=100))
-    lmf = mg(xs, lower[:-1], [0, lower[-1], lower[-1], 0])
-    umf = mg(xs, upper, [0, 1, 1, 0])
-    ca_left = ekm(xs, lmf, umf, -1)
-    ca_right = ekm(xs, lmf, umf, 1)
+    xs = np.linspace(upper[0], upper[3], num=num)
+    lmf = mg_array(xs, lower[:-1], [0, lower[-1], lower[-1], 0])
+    umf = mg_array(xs, upper, [0, 1, 1, 0])
+    
+    # c_l and c_r are about as far from the centroid of the UMF, so c_r
+    # starts from the reflection of c_l
+    ca_left = profiling.stage('centroid.ekm', ekm, xs, lmf, umf, -1)
+    start = 2 * _centroid(xs, umf) - ca_left
+    ca_right = profiling.stage('centroid.ekm', ekm, xs, lmf, umf, 1, start)
     ca = (ca_left + ca_right) / 2
     return [ca_left, ca_right, ca]
      
 
+def _pl_moments(xk, yk, theta):
+    """Zeroth and first moments of piecewise-linear MFs integrated up to theta
+    
+    xk, yk: (N, K) arrays of sorted breakpoints of the MFs
+    theta: (N,) array of upper limits of integration
+    """
+    
+    x0, x1 = xk[:, :-1], xk[:, 1:]
+    y0, y1 = yk[:, :-1], yk[:, 1:]
+    width = x1 - x0
+    slope = np.divide(y1 - y0, width, out=np.zeros_like(width), where=width > 0)
+    
+    # integrate each segment from its left end to theta (clipped to the segment)
+    length = np.clip(theta[:, None], x0, x1) - x0
+    m0 = y0 * length + slope * length**2 / 2
+    m1 = x0 * y0 * length + (x0 * slope + y0) * length**2 / 2 + slope * length**3 / 3
+    return m0.sum(axis=-1), m1.sum(axis=-1)
+
+
+def _km_continuous(xk_head, yk_head, xk_tail, yk_tail, theta, tol=1e-12, max_iter=100):
+    """Continuous KM iterations: the head MF is used left of the switch point theta
+    and the tail MF right of it. Each step is a Newton step on the optimality
+    condition, so theta converges quadratically to the switch point.
+    """
+    
+    inf = np.full(len(theta), np.inf)
+    t0_tail, t1_tail = _pl_moments(xk_tail, yk_tail, inf)
+    iterations = 0
+    for _ in range(max_iter):
+        iterations += 1
+        m0_head, m1_head = _pl_moments(xk_head, yk_head, theta)
+        m0_tail, m1_tail = _pl_moments(xk_tail, yk_tail, theta)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            theta_new = (m1_head + t1_tail - m1_tail) / (m0_head + t0_tail - m0_tail)
+        theta_new = np.where(np.isfinite(theta_new), theta_new, theta)
+        converged = np.abs(theta_new - theta) <= tol * (1 + np.abs(theta))
+        theta = theta_new
+        if converged.all():
+            break
+    profiling.count('km_continuous.problems', len(theta))
+    profiling.count('km_continuous.iterations', iterations)
+    return theta
+
+
+def centroid_it2_exact(it2fss):
+    """To compute the exact centroids of IT2 FSs with trapezoidal MFs
+    
+    it2fss: (N, 9) array of IT2 FSs in the [a, b, c, d, e, f, g, i, h] layout
+    
+    The switch points are found on the continuous piecewise-linear UMF and LMF
+    rather than on a discretization, so the result does not depend on a number
+    of points. Unlike mg, breakpoints that coincide keep their parameter order,
+    so the right shoulders [a, b, 10, 10] stay at full height up to 10.
+    
+    Returns an (N, 3) array of [c_l, c_r, center] rows.
+    """
+    
+    fous = np.asarray(it2fss, dtype=float).reshape(-1, 9)
+    n = len(fous)
+    height = fous[:, 8:]
+    zeros = np.zeros_like(height)
+    
+    xk_upper = fous[:, :4]
+    yk_upper = np.hstack([zeros, np.ones_like(height), np.ones_like(height), zeros])
+    xk_lower = fous[:, 4:8]
+    yk_lower = np.hstack([zeros, height, height, zeros])
+    order = np.argsort(xk_upper, axis=-1, kind='stable')
+    xk_upper = np.take_along_axis(xk_upper, order, axis=-1)
+    yk_upper = np.take_along_axis(yk_upper, order, axis=-1)
+    order = np.argsort(xk_lower, axis=-1, kind='stable')
+    xk_lower = np.take_along_axis(xk_lower, order, axis=-1)
+    yk_lower = np.take_along_axis(yk_lower, order, axis=-1)
+    
+    # c_l <= centroid of the UMF <= c_r, so start both iterations from there
+    inf = np.full(n, np.inf)
+    t0_upper, t1_upper = _pl_moments(xk_upper, yk_upper, inf)
+    t0_lower, _ = _pl_moments(xk_lower, yk_lower, inf)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        start = np.where(t0_upper > 0, t1_upper / t0_upper, 0)
+    
+    ca_left = _km_continuous(xk_upper, yk_upper, xk_lower, yk_lower, start)
+    ca_right = _km_continuous(xk_lower, yk_lower, xk_upper, yk_upper, start)
+    
+    # Degenerate FOUs, handled the same way as in ekm
+    no_lower = t0_lower == 0
+    ca_left[no_lower] = xk_upper[no_lower, 0]
+    ca_right[no_lower] = xk_upper[no_lower, -1]
+    no_upper = (t0_upper == 0) | (xk_upper[:, -1] == 0)
+    ca_left[no_upper] = 0
+    ca_right[no_upper] = 0
+    
+    ca = (ca_left + ca_right) / 2
+    return np.column_stack([ca_left, ca_right, ca])
+
+
+def ekm_batch(x_point, w_lower, w_upper, max_flag, start=None):
+    """Vectorized Enhanced KM algorithm, solving one problem per row
+    
+    x_point: (N, M) array of x values
+    w_lower: (N, M) array of lower membership values for each x
+    w_upper: (N, M) array of upper membership values for each x
+    max_flag: 1 to output the maximum; -1 to output the minimum
+    start: optional (N,) array of initial guesses of the switch points
+    
+    Returns an array of N values that agree with ekm applied to each row.
+    """
+    
+    x = np.atleast_2d(np.asarray(x_point, dtype=float))
+    lower = np.atleast_2d(np.asarray(w_lower, dtype=float))
+    upper = np.atleast_2d(np.asarray(w_upper, dtype=float))
+    
+    order = np.argsort(x, axis=-1, kind='stable')
+    x = np.take_along_axis(x, order, axis=-1)
+    lower = np.take_along_axis(lower, order, axis=-1)
+    upper = np.take_along_axis(upper, order, axis=-1)
+    n, ly = x.shape
+    
+    # The first k + 1 points take the ``head`` weights and the rest ``tail`` ones
+    if max_flag < 0:
+        head, tail = upper, lower
+        k = int(ly // 2.4)
+    else:
+        head, tail = lower, upper
+        k = int(ly // 1.7)
+    
+    # Prefix sums, so that the weighted average for any switch point is O(1)
+    zeros = np.zeros((n, 1))
+    a_head = np.hstack([zeros, np.cumsum(x * head, axis=-1)])
+    b_head = np.hstack([zeros, np.cumsum(head, axis=-1)])
+    a_tail = np.hstack([zeros, np.cumsum(x * tail, axis=-1)])
+    b_tail = np.hstack([zeros, np.cumsum(tail, axis=-1)])
+    
+    def weighted_average(rows, k):
+        a = a_head[rows, k + 1] + a_tail[rows, -1] - a_tail[rows, k + 1]
+        b = b_head[rows, k + 1] + b_tail[rows, -1] - b_tail[rows, k + 1]
+        return a / b
+    
+    # Rows that are answered directly, as in ekm
+    no_upper = (upper.max(axis=-1) == 0) | (x[:, -1] == 0)
+    no_lower = lower.max(axis=-1) == 0
+    regular = ~(no_upper | no_lower)
+    
+    rows = np.arange(n)
+    if start is None:
+        k = np.full(n, min(k, ly - 1))
+    else:
+        start = np.asarray(start, dtype=float).reshape(n, 1)
+        k = np.clip(np.count_nonzero(x <= start, axis=-1) - 1, 0, ly - 1)
+    y = np.zeros(n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y[regular] = weighted_average(rows[regular], k[regular])
+        # y is never below the smallest x, except by rounding, so the switch
+        # index is clamped at 0 rather than flipping between -1 and 0
+        k_new = np.maximum(np.count_nonzero(x <= y[:, None], axis=-1) - 1, 0)
+        active = regular & (k_new != k)
+        
+        # KM always converges in at most ly iterations
+        iterations = 0
+        for _ in range(ly):
+            if not active.any():
+                break
+            iterations += 1
+            k[active] = k_new[active]
+            y[active] = weighted_average(rows[active], k[active])
+            k_new[active] = np.maximum(np.count_nonzero(x[active] <= y[active, None], axis=-1) - 1, 0)
+            active &= k_new != k
+    
+    y[no_lower] = x[no_lower, -1] if max_flag > 0 else x[no_lower, 0]
+    y[no_upper] = 0
+    profiling.count('ekm_batch.problems', n)
+    profiling.count('ekm_batch.iterations', iterations)
+    return y
+
+
+def centroid_it2_batch(it2fss, num=100, exact=False):
+    """To compute the centroids of many IT2 FSs at once
+    
+    it2fss: (N, 9) array of IT2 FSs, each row in the nine-parameter layout
+        [a, b, c, d, e, f, g, i, h] used by jaccard and lwa (UMF then LMF)
+    num: number of points used to discretize each FOU
+    exact: use centroid_it2_exact instead of a discretization
+    
+    Returns an (N, 3) array of [c_l, c_r, center] rows. They match centroid_it2
+    on the same FOUs to within 1e-9; differences only come from summation order.
+    """
+    
+    if exact:
+        return centroid_it2_exact(it2fss)
+    
+    fous = np.asarray(it2fss, dtype=float).reshape(-1, 9)
+    xs = np.linspace(fous[:, 0], fous[:, 3], num=num, axis=-1)
+    lmf, umf = profiling.stage('centroid.mg', mg_it2, xs, fous)
+    
+    ca_left = profiling.stage('centroid.ekm', ekm_batch, xs, lmf, umf, -1)
+    start = 2 * _centroid(xs, umf) - ca_left
+    ca_right = profiling.stage('centroid.ekm', ekm_batch, xs, lmf, umf, 1, start)
+    ca = (ca_left + ca_right) / 2
+    return np.column_stack([ca_left, ca_right, ca])
+     
+
 # Testing these functions
 def main():
     
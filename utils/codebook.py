@@ -0,0 +1,326 @@
+import json
+import mmap
+import os
+import re
+
+from utils.it2fs import SHAPES
+import numpy as np
+
+MAGIC = b'IT2FSCB1'
+
+# n words, n embedded T1 FSs and the byte offsets of the sections
+_header = np.dtype([
+    ('magic', 'S8'),
+    ('words', '<u8'),
+    ('et1fs', '<u8'),
+    ('mfs_offset', '<u8'),
+    ('shapes_offset', '<u8'),
+    ('names_index_offset', '<u8'),
+    ('names_offset', '<u8'),
+    ('et1fs_index_offset', '<u8'),
+    ('et1fs_offset', '<u8'),
+])
+
+
+def _align(offset):
+    return (offset + 7) // 8 * 8
+
+
+def write_codebook(words_status, path):
+    """Writing a words status dictionary as a binary codebook file
+    
+    words_status: a dictionary like the output of process_fuzzy_set_part
+    path: the codebook file
+    
+    The file holds fixed-size columns that Codebook maps into memory:
+    an (N, 9) float64 array of MFs in the [a, b, c, d, e, f, g, i, h] layout,
+    shape codes indexing SHAPES, a string table of the words and the embedded
+    T1 FSs of all the words, indexed by offsets.
+    """
+    
+    words = list(words_status)
+    n = len(words)
+    mfs = np.array([[*words_status[w]['MF'][1], *words_status[w]['MF'][0]] for w in words],
+                   dtype='<f8').reshape(n, 9)
+    shapes = np.array([SHAPES.index(words_status[w]['shape']) for w in words], dtype='i1')
+    
+    names = [w.encode('utf-8') for w in words]
+    names_index = np.zeros(n + 1, dtype='<u8')
+    np.cumsum([len(name) for name in names], out=names_index[1:])
+    
+    et1fs = [np.asarray(words_status[w].get('ET1FS', []), dtype='<f8').reshape(-1, 2) for w in words]
+    et1fs_index = np.zeros(n + 1, dtype='<u8')
+    np.cumsum([len(fs) for fs in et1fs], out=et1fs_index[1:])
+    
+    header = np.zeros((), dtype=_header)
+    header['magic'] = MAGIC
+    header['words'] = n
+    header['et1fs'] = et1fs_index[-1]
+    sections = [
+        ('mfs_offset', mfs.tobytes()),
+        ('shapes_offset', shapes.tobytes()),
+        ('names_index_offset', names_index.tobytes()),
+        ('names_offset', b''.join(names)),
+        ('et1fs_index_offset', et1fs_index.tobytes()),
+        ('et1fs_offset', b''.join(fs.tobytes() for fs in et1fs)),
+    ]
+    offset = _header.itemsize
+    for field, data in sections:
+        offset = _align(offset)
+        header[field] = offset
+        offset += len(data)
+    
+    with open(path, 'wb') as file:
+        file.write(header.tobytes())
+        for field, data in sections:
+            file.seek(int(header[field]))
+            file.write(data)
+
+
+class Codebook:
+    """A binary codebook file written by write_codebook, mapped into memory.
+    
+    Nothing is deserialized when the file is opened: the MFs, shapes and
+    embedded T1 FSs are read-only views of the file, and words are looked up in
+    constant time through a dictionary built from the string table on first use.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._raw = np.memmap(path, dtype=np.uint8, mode='r')
+        if len(self._raw) < _header.itemsize:
+            raise ValueError(f'{path} is not an IT2 FS codebook')
+        header = self._raw[:_header.itemsize].view(_header)[0]
+        if header['magic'] != MAGIC:
+            raise ValueError(f'{path} is not an IT2 FS codebook')
+        
+        n = int(header['words'])
+        self.mfs = self._section(header['mfs_offset'], '<f8', (n, 9))
+        self.shapes = self._section(header['shapes_offset'], 'i1', (n,))
+        self._names_index = self._section(header['names_index_offset'], '<u8', (n + 1,))
+        self._names = self._section(header['names_offset'], 'u1', (int(self._names_index[-1]),))
+        self._et1fs_index = self._section(header['et1fs_index_offset'], '<u8', (n + 1,))
+        self._et1fs = self._section(header['et1fs_offset'], '<f8', (int(header['et1fs']), 2))
+        self._lookup = None
+    
+    def _section(self, offset, dtype, shape):
+        dtype = np.dtype(dtype)
+        offset = int(offset)
+        size = int(np.prod(shape)) * dtype.itemsize
+        return self._raw[offset:offset + size].view(dtype).reshape(shape)
+    
+    def __len__(self):
+        return len(self.shapes)
+    
+    def __contains__(self, word):
+        return word in self._index()
+    
+    def __iter__(self):
+        return iter(self.words)
+    
+    def _index(self):
+        if self._lookup is None:
+            self._lookup = {word: i for i, word in enumerate(self.words)}
+        return self._lookup
+    
+    @property
+    def words(self):
+        """The words, in file order"""
+        
+        names = self._names.tobytes()
+        index = self._names_index.tolist()
+        return [names[start:stop].decode('utf-8') for start, stop in zip(index, index[1:])]
+    
+    def index(self, word):
+        """Row of a word in mfs and shapes"""
+        
+        return self._index()[word]
+    
+    def fou(self, word):
+        """Nine parameters [a, b, c, d, e, f, g, i, h] of the IT2 FS of a word"""
+        
+        return self.mfs[self.index(word)]
+    
+    def mf(self, word):
+        """MF of a word as [[e, f, g, i, h], [a, b, c, d]], like in words status"""
+        
+        fou = self.fou(word).tolist()
+        return [fou[4:], fou[:4]]
+    
+    def shape(self, word):
+        return SHAPES[self.shapes[self.index(word)]]
+    
+    def et1fs(self, word):
+        """(k, 2) array of the embedded T1 FSs of a word"""
+        
+        i = self.index(word)
+        return self._et1fs[int(self._et1fs_index[i]):int(self._et1fs_index[i + 1])]
+    
+    def __getitem__(self, word):
+        """Status of a word, like in the output of process_fuzzy_set_part"""
+        
+        return {'shape': self.shape(word), 'MF': self.mf(word), 'ET1FS': self.et1fs(word).tolist()}
+
+
+
+# a top-level word and the start of its status, which is an object with the
+# fields of fuzzy_part; nothing in a status can match it
+_entry = re.compile(rb'[{,]\s*("(?:[^"\\]|\\.)*")\s*:\s*(?=\{\s*"(?:shape|MF|ET1FS)")')
+_fields = ('shape', 'MF', 'ET1FS')
+_decoder = json.JSONDecoder()
+
+
+class LazyCodebook:
+    """A words status json file, like words_status.json, decoded on demand.
+    
+    Opening the file only indexes where the status of each word starts, with a
+    regular expression over the memory-mapped file. Nothing is written to disk
+    unless index_cache asks for it, in which case the index is saved to a file
+    and reused while the json file is unchanged. The shape and MF of a word are decoded on first access and kept, and its
+    embedded T1 FSs are decoded each time they are asked for.
+    
+    Words are looked up like in Codebook.
+    """
+    
+    def __init__(self, path, index_cache=False):
+        """path: the words status json file
+        index_cache: False to index the json file every time, True to read and
+            write the index in path + '.index', or the path of the index file
+        """
+        
+        self.path = os.fspath(path)
+        with open(self.path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            self._raw = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b''
+        
+        index_path = self.path + '.index' if index_cache is True else index_cache
+        index = self._read_index(index_path, stat) if index_cache else None
+        if index is None:
+            index = self._build_index(stat)
+            if index_cache:
+                self._write_index(index_path, index)
+        self.words = index['words']
+        self._starts = index['starts']
+        self._ends = index['ends']
+        self._lookup = {word: i for i, word in enumerate(self.words)}
+        self._shapes = {}
+        self._mfs = {}
+        self._positions = {}
+    
+    def _build_index(self, stat):
+        if self._raw[:64].lstrip()[:1] != b'{':
+            raise ValueError(f'{self.path} is not a words status json file')
+        words, starts, ends = [], [], []
+        for match in _entry.finditer(self._raw):
+            if starts:
+                ends.append(match.start())
+            words.append(json.loads(match.group(1)))
+            starts.append(match.end())
+        if starts:
+            ends.append(self._raw.rfind(b'}'))
+        elif self._raw[:].strip() != b'{}':
+            raise ValueError(f'{self.path} is not a words status json file')
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                'words': words, 'starts': starts, 'ends': ends}
+    
+    @staticmethod
+    def _read_index(index_path, stat):
+        try:
+            with open(index_path) as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if index.get('size') != stat.st_size or index.get('mtime_ns') != stat.st_mtime_ns:
+            return None
+        return index
+    
+    @staticmethod
+    def _write_index(index_path, index):
+        # written aside and renamed, so a reader never sees half an index
+        temporary = f'{index_path}.{os.getpid()}.tmp'
+        try:
+            with open(temporary, 'w') as file:
+                json.dump(index, file)
+            os.replace(temporary, index_path)
+        except OSError:
+            # a read-only directory only costs the indexing at the next start
+            if os.path.exists(temporary):
+                os.remove(temporary)
+    
+    def __len__(self):
+        return len(self.words)
+    
+    def __contains__(self, word):
+        return word in self._lookup
+    
+    def __iter__(self):
+        return iter(self.words)
+    
+    def index(self, word):
+        """Position of a word in words"""
+        
+        return self._lookup[word]
+    
+    def _field(self, i, name):
+        """Decoding one field of the status of the word at position i"""
+        
+        positions = self._positions.get(i)
+        if positions is None:
+            start, end = self._starts[i], self._ends[i]
+            positions = {field: self._raw.find(b'"%s"' % field.encode(), start, end)
+                         for field in _fields}
+            positions = self._positions[i] = {
+                field: position for field, position in positions.items() if position >= 0}
+        if name not in positions:
+            raise KeyError(name)
+        
+        # the field runs up to the next one, or to the end of the status
+        position = positions[name]
+        stop = min([p for p in positions.values() if p > position], default=self._ends[i])
+        text = self._raw[position + len(name) + 2:stop].decode('utf-8').lstrip()
+        return _decoder.raw_decode(text[1:].lstrip())[0]
+    
+    def shape(self, word):
+        i = self.index(word)
+        if i not in self._shapes:
+            self._shapes[i] = self._field(i, 'shape')
+        return self._shapes[i]
+    
+    def mf(self, word):
+        """MF of a word as [[e, f, g, i, h], [a, b, c, d]], like in words status"""
+        
+        i = self.index(word)
+        if i not in self._mfs:
+            self._mfs[i] = self._field(i, 'MF')
+        lmf, umf = self._mfs[i]
+        return [list(lmf), list(umf)]
+    
+    def fou(self, word):
+        """Nine parameters [a, b, c, d, e, f, g, i, h] of the IT2 FS of a word"""
+        
+        lmf, umf = self.mf(word)
+        return np.array([*umf, *lmf], dtype=float)
+    
+    def fous(self, words=None):
+        """(N, 9) array of the IT2 FSs of words, all of them by default, for the
+        batch utilities"""
+        
+        words = self.words if words is None else words
+        return np.array([self.fou(word) for word in words], dtype=float).reshape(-1, 9)
+    
+    def et1fs(self, word):
+        """(k, 2) array of the embedded T1 FSs of a word, decoded on each call"""
+        
+        i = self.index(word)
+        try:
+            et1fs = self._field(i, 'ET1FS')
+        except KeyError:
+            et1fs = []
+        return np.array(et1fs, dtype=float).reshape(-1, 2)
+    
+    def __getitem__(self, word):
+        """Status of a word, like in the output of process_fuzzy_set_part"""
+        
+        i = self.index(word)
+        text = self._raw[self._starts[i]:self._ends[i]].decode('utf-8')
+        return _decoder.raw_decode(text)[0]
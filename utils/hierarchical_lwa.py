@@ -0,0 +1,149 @@
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from utils.linguistic_weighted_average import lwa
+
+
+class CriteriaTree:
+    """A hierarchy of criteria aggregated bottom-up with LWAs.
+    
+    Leaves hold IT2 FSs and every other node is the LWA of its children with
+    IT2 FS weights, all defined by nine parameters. Node values are cached, so
+    changing a leaf or a weight only recomputes the nodes above it.
+    """
+    
+    def __init__(self, n=2):
+        """n: number of alpha-cuts used by the LWAs"""
+        
+        self.n = n
+        self.evaluations = 0  # number of LWAs computed so far
+        self._leaves = {}
+        self._children = {}  # node -> [(child, weight), ...]
+        self._parents = {}  # node -> set of nodes using it
+        self._values = {}
+    
+    def __contains__(self, name):
+        return name in self._leaves or name in self._children
+    
+    def add_leaf(self, name, fou):
+        """Adding a leaf criterion with its IT2 FS"""
+        
+        if name in self:
+            raise ValueError(f'{name!r} is already in the tree')
+        self._leaves[name] = list(fou)
+        self._parents[name] = set()
+    
+    def add_node(self, name, children):
+        """Adding a criterion aggregating existing ones
+        
+        children: a list of (child name, IT2 FS weight) pairs
+        """
+        
+        if name in self:
+            raise ValueError(f'{name!r} is already in the tree')
+        if not children:
+            raise ValueError(f'{name!r} has no children')
+        for child, _ in children:
+            if child not in self:
+                raise KeyError(child)
+        
+        self._children[name] = [(child, list(weight)) for child, weight in children]
+        self._parents[name] = set()
+        for child, _ in children:
+            self._parents[child].add(name)
+    
+    def set_leaf(self, name, fou):
+        """Changing the IT2 FS of a leaf"""
+        
+        if name not in self._leaves:
+            raise KeyError(name)
+        self._leaves[name] = list(fou)
+        self._invalidate(name)
+    
+    def set_weight(self, name, child, weight):
+        """Changing the weight of a child of a node"""
+        
+        children = self._children[name]
+        for i, (c, _) in enumerate(children):
+            if c == child:
+                children[i] = (c, list(weight))
+                break
+        else:
+            raise KeyError(child)
+        self._invalidate(name)
+    
+    def _invalidate(self, name):
+        """Dropping the cached values of a node and all of its ancestors"""
+        
+        stack = [name]
+        while stack:
+            node = stack.pop()
+            if self._values.pop(node, None) is not None or node == name:
+                stack.extend(self._parents[node])
+    
+    def _dirty(self, name):
+        """Nodes below (and including) name that need to be computed"""
+        
+        dirty = set()
+        stack = [name]
+        while stack:
+            node = stack.pop()
+            if node in dirty or node in self._values or node in self._leaves:
+                continue
+            dirty.add(node)
+            stack.extend(child for child, _ in self._children[node])
+        return dirty
+    
+    def value(self, name):
+        """The IT2 FS of a node, computing it first if needed"""
+        
+        if name in self._leaves:
+            return self._leaves[name]
+        if name not in self._values:
+            self.evaluate(name)
+        return self._values[name]
+    
+    def _arguments(self, node):
+        children = self._children[node]
+        x = [self.value(child) for child, _ in children]
+        w = [weight for _, weight in children]
+        return x, w, self.n
+    
+    def evaluate(self, name, executor=None):
+        """Computing the IT2 FS of a node bottom-up
+        
+        name: the node to compute
+        executor: an optional concurrent.futures executor; nodes whose children
+            are ready are submitted together, so independent subtrees run in
+            parallel
+        
+        return value: the LWA of the node approximated by 9 parameters.
+        """
+        
+        if name in self._leaves:
+            return self._leaves[name]
+        
+        dirty = self._dirty(name)
+        pending = {node: {c for c, _ in self._children[node]} & dirty for node in dirty}
+        running = {}
+        
+        while pending or running:
+            ready = [node for node, waiting in pending.items() if not waiting]
+            for node in ready:
+                del pending[node]
+                if executor is None:
+                    self._done(node, lwa(*self._arguments(node))[0], pending)
+                else:
+                    running[executor.submit(lwa, *self._arguments(node))] = node
+            
+            if running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    self._done(running.pop(future), future.result()[0], pending)
+        
+        return self._values[name]
+    
+    def _done(self, node, value, pending):
+        self._values[node] = value
+        self.evaluations += 1
+        for waiting in pending.values():
+            waiting.discard(node)
@@ -0,0 +1,162 @@
+import struct
+
+import numpy as np
+
+# shapes of the FOUs of words, whose indices are the shape codes of
+# fuzzy_part_batch and of the binary codebooks
+SHAPES = ('left-shoulder', 'interior', 'right-shoulder')
+
+_layout = struct.Struct('<9d')
+
+
+class IT2FS:
+    """An immutable IT2 FS with lazily cached derived quantities.
+    
+    It can be built from either layout of the utilities, [[e, f, g, i, h],
+    [a, b, c, d]] like in words status and centroid_it2, or the nine parameters
+    [a, b, c, d, e, f, g, i, h] (eight parameters have an LMF height of 1), or
+    from another IT2FS. It behaves like the sequence of the nine parameters and
+    converts to a read-only NumPy array without copying, so the functions of
+    the utils package accept it wherever they take nine parameters, and
+    centroid_it2 also accepts it.
+    
+    The parameters are kept as 72 bytes in a two-slot object, so an IT2FS takes
+    about a third of the memory of the same FOU as nested lists. Equal IT2 FSs
+    have the same hash and can be used as cache keys.
+    
+    The centroids and the discretized MFs are computed on first use and kept
+    with the IT2 FS, in a dictionary that is only allocated then.
+    """
+    
+    __slots__ = ('_params', '_cache')
+    
+    def __init__(self, it2fs):
+        if isinstance(it2fs, IT2FS):
+            params = it2fs._params
+        else:
+            if len(it2fs) == 2:
+                lower, upper = it2fs
+                it2fs = [*upper, *lower]
+            it2fs = [float(p) for p in it2fs]
+            if len(it2fs) == 8:
+                it2fs.append(1.0)
+            if len(it2fs) != 9:
+                raise ValueError(f'an IT2 FS has 8 or 9 parameters, not {len(it2fs)}')
+            # adding 0.0 turns -0.0 into 0.0, so that equal IT2 FSs have equal bytes
+            params = _layout.pack(*(p + 0.0 for p in it2fs))
+        object.__setattr__(self, '_params', params)
+        object.__setattr__(self, '_cache', None)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+    
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+    
+    def __reduce__(self):
+        return type(self), (self.params,)
+    
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self.params)})'
+    
+    def __eq__(self, other):
+        if not isinstance(other, IT2FS):
+            return NotImplemented
+        return self._params == other._params
+    
+    def __hash__(self):
+        return hash(self._params)
+    
+    def __len__(self):
+        return 9
+    
+    def __getitem__(self, index):
+        return self.params[index]
+    
+    def __iter__(self):
+        return iter(self.params)
+    
+    def __array__(self, dtype=None, copy=None):
+        array = np.frombuffer(self._params, dtype='<f8')
+        if copy or (dtype is not None and np.dtype(dtype) != array.dtype):
+            return np.array(array, dtype=dtype)
+        return array
+    
+    @property
+    def params(self):
+        """The nine parameters (a, b, c, d, e, f, g, i, h)"""
+        
+        return _layout.unpack(self._params)
+    
+    @property
+    def umf(self):
+        """(a, b, c, d)"""
+        
+        return self.params[:4]
+    
+    @property
+    def lmf(self):
+        """(e, f, g, i, h), with the height of the LMF like the T1 FSs of fwa"""
+        
+        return self.params[4:]
+    
+    @property
+    def height(self):
+        return self.params[8]
+    
+    @property
+    def mf(self):
+        """[[e, f, g, i, h], [a, b, c, d]], like in words status"""
+        
+        params = self.params
+        return [list(params[4:]), list(params[:4])]
+    
+    @property
+    def support(self):
+        """(a, d), the support of the UMF and so of the FOU"""
+        
+        params = self.params
+        return params[0], params[3]
+    
+    def _cached(self, key, function, *args):
+        cache = self._cache
+        if cache is None:
+            cache = {}
+            object.__setattr__(self, '_cache', cache)
+        value = cache.get(key)
+        if value is None:
+            value = cache[key] = function(*args)
+        return value
+    
+    def centroid(self, num=100, exact=False):
+        """[c_l, c_r, center] of centroid_it2, computed once per num and exact"""
+        
+        from utils.centroid_it2fs import centroid_it2
+        
+        key = ('centroid', None if exact else num, exact)
+        return list(self._cached(key, lambda: tuple(centroid_it2(self.mf, num, exact))))
+    
+    @property
+    def centroid_interval(self):
+        """(c_l, c_r) of the default centroid"""
+        
+        return tuple(self.centroid()[:2])
+    
+    def discretize(self, num=100, lower=None, upper=None):
+        """x, LMF and UMF grades on num points from lower to upper, the support
+        by default; the read-only arrays are computed once per grid"""
+        
+        from utils.centroid_it2fs import mg_it2
+        
+        a, d = self.support
+        lower = a if lower is None else lower
+        upper = d if upper is None else upper
+        
+        def grades():
+            x = np.linspace(lower, upper, num=num)
+            lmf, umf = mg_it2(x, np.asarray(self))
+            for array in (x, lmf, umf):
+                array.flags.writeable = False
+            return x, lmf, umf
+        
+        return self._cached(('discretize', num, float(lower), float(upper)), grades)
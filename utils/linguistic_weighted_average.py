@@ -1,4 +1,4 @@
-from utils.centroid_it2fs import ekm
+from utils.centroid_it2fs import ekm, ekm_batch
 import numpy as np
 
 def fwa(x, w, n=2):
@@ -15,13 +15,8 @@ def fwa(x, w, n=2):
     """
     
     # If the T1 FS has only four parameters, then its height is considered as 1
-    for fs in x:
-        if len(fs) == 4:
-            fs.append(1)
-            
-    for fs in w:
-        if len(fs) == 4:
-            fs.append(1)
+    x = [[*fs, 1] if len(fs) == 4 else fs for fs in x]
+    w = [[*fs, 1] if len(fs) == 4 else fs for fs in w]
     
     # height of the FWA
     hmin = min([i[4] for i in x] + [i[4] for i in w])
@@ -31,6 +26,9 @@ def fwa(x, w, n=2):
     
     y = [None] * (2 * n)
     
+    # the alpha-cuts change little from one level to the next, so each EKM
+    # problem starts from the switch point of the previous level
+    left = right = None
     for i in range(n):
         a = []
         b = []
@@ -46,8 +44,8 @@ def fwa(x, w, n=2):
             c.append(w[j][0] + (w[j][1] - w[j][0]) * mu[i] / w[j][4])
             d.append(w[j][3] - (w[j][3] - w[j][2]) * mu[i] / w[j][4])
             
-        y[i] = ekm(a, c, d, -1)
-        y[-(i + 1)] = ekm(b, c, d, 1)
+        y[i] = left = ekm(a, c, d, -1, start=left)
+        y[-(i + 1)] = right = ekm(b, c, d, 1, start=right)
         
     return [[y[0], y[n - 1], y[n], y[-1] , hmin], y, mu.tolist()]
 
@@ -65,13 +63,8 @@ def lwa(x, w, n=2):
     """
     
     # If the IT2 FS has only eight parameters, then its height is considered as 1
-    for fs in x:
-        if len(fs) == 8:
-            fs.append(1)
-            
-    for fs in w:
-        if len(fs) == 8:
-            fs.append(1)
+    x = [[*fs, 1] if len(fs) == 8 else fs for fs in x]
+    w = [[*fs, 1] if len(fs) == 8 else fs for fs in w]
     
     Y_upper, UMFYy, UMFYmu = fwa([i[:4] for i in x], [i[:4] for i in w], n)
     Y_lower, LMFYy, LMFYmu = fwa([i[4:] for i in x], [i[4:] for i in w], n)
@@ -79,6 +72,91 @@ def lwa(x, w, n=2):
     return [Y_upper[:4] + Y_lower, LMFYy, LMFYmu, UMFYy, UMFYmu]
             
 
+def _with_height(fss, size):
+    """Appending a height of 1 to an array of FSs that have only size parameters"""
+    
+    fss = np.asarray(fss, dtype=float)
+    if fss.shape[-1] == size:
+        fss = np.concatenate([fss, np.ones(fss.shape[:-1] + (1,))], axis=-1)
+    return fss
+
+
+def fwa_batch(x, w, n=2):
+    """Computing the FWA of many alternatives at once for trapezoidal T1 FSs
+    
+    x: (A, N, 5) array of T1 FSs for the subcriteria of A alternatives, or
+        (N, 5) for a single one. Four-parameter T1 FSs have a height of 1.
+    w: T1 FSs for the weights, either (A, N, 5) or (N, 5) shared by all alternatives.
+    n: number of alpha-cuts. The default value is 2.
+    
+    The alpha-cut endpoints of every alternative are computed as arrays and all
+    the EKM problems are solved together. The inputs are not modified.
+    
+    return values, with a leading axis of A if there are several alternatives:
+    the FWA approximated by 5 parameters.
+    y- and mu-coordinates of the FWA.
+    """
+    
+    x = _with_height(x, 4)
+    w = _with_height(w, 4)
+    single = x.ndim == 2 and w.ndim == 2
+    x, w = np.broadcast_arrays(x, w)
+    if single:
+        x, w = x[None], w[None]
+    alternatives, inputs, _ = x.shape
+    
+    # height and mu-coordinates of the FWAs
+    hmin = np.minimum(x[..., 4].min(axis=-1), w[..., 4].min(axis=-1))
+    levels = np.concatenate([np.arange(0, 1 + 0.01, 1 / (n - 1)), np.arange(1, 0 - 0.01, -1 / (n - 1))])
+    mu = hmin[:, None] * levels
+    
+    # alpha-cuts on x and w for every alternative, alpha level and input
+    m = mu[:, :n, None]
+    x = x[:, None]
+    w = w[:, None]
+    a = x[..., 0] + (x[..., 1] - x[..., 0]) * m / x[..., 4]
+    b = x[..., 3] - (x[..., 3] - x[..., 2]) * m / x[..., 4]
+    c = w[..., 0] + (w[..., 1] - w[..., 0]) * m / w[..., 4]
+    d = w[..., 3] - (w[..., 3] - w[..., 2]) * m / w[..., 4]
+    
+    shape = (alternatives * n, inputs)
+    c = c.reshape(shape)
+    d = d.reshape(shape)
+    left = ekm_batch(a.reshape(shape), c, d, -1).reshape(alternatives, n)
+    right = ekm_batch(b.reshape(shape), c, d, 1).reshape(alternatives, n)
+    
+    y = np.concatenate([left, right[:, ::-1]], axis=-1)
+    fwa = np.column_stack([y[:, 0], y[:, n - 1], y[:, n], y[:, -1], hmin])
+    if single:
+        return fwa[0], y[0], mu[0]
+    return fwa, y, mu
+
+
+def lwa_batch(x, w, n=2):
+    """Computing the LWA of many alternatives at once for IT2 FSs determined by
+    the nine parameters
+    
+    x: (A, N, 9) array of MFs of the subcriteria of A alternatives, or (N, 9)
+        for a single one. Eight-parameter IT2 FSs have an LMF height of 1.
+    w: MFs of the weights, either (A, N, 9) or (N, 9) shared by all alternatives.
+    n: number of alpha-cuts. Default is 2.
+    
+    return values, with a leading axis of A if there are several alternatives:
+    Y: the LWA approximated by 9 parameters.
+    LMFYy and LMFYmu: y- and mu-coordinates of the LMF of the LWA
+    UMFYy and UMFYmu: y- and mu-coordinates of the UMF of the LWA
+    """
+    
+    x = _with_height(x, 8)
+    w = _with_height(w, 8)
+    
+    Y_upper, UMFYy, UMFYmu = fwa_batch(x[..., :4], w[..., :4], n)
+    Y_lower, LMFYy, LMFYmu = fwa_batch(x[..., 4:], w[..., 4:], n)
+    
+    Y = np.concatenate([Y_upper[..., :4], Y_lower], axis=-1)
+    return Y, LMFYy, LMFYmu, UMFYy, UMFYmu
+            
+
 # Testing these functions
 def main():
     
@@ -0,0 +1,149 @@
+"""Optional instrumentation of the EIA and IT2 FS hot paths
+
+Nothing is recorded unless a Profile is active:
+
+    with Profile() as profile:
+        run_eia(words, workers=0)
+    profile.to_json('profile.json')
+
+The instrumented functions look up the active profile in a context variable
+and skip all timing when there is none, so the cost of a disabled profile is
+one lookup per stage. A profile is active in the context (thread or task) it
+was entered in; run_eia collects the profiles of its worker processes.
+"""
+
+import json
+import time
+from contextvars import ContextVar
+
+_active = ContextVar('profile', default=None)
+
+
+class Profile:
+    """Per-stage wall times, dropped items, counters and per-word timings
+    
+    callback: optional function called with an event dictionary for each
+        recorded stage, counter or word, e.g. for streaming them to a logger
+    """
+    
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.stages = {}  # name -> {'calls': int, 'seconds': float, 'dropped': int}
+        self.counters = {}
+        self.words = {}  # word -> seconds
+        self._tokens = []
+    
+    def __enter__(self):
+        self._tokens.append(_active.set(self))
+        return self
+    
+    def __exit__(self, *exc_info):
+        _active.reset(self._tokens.pop())
+    
+    def add_stage(self, name, seconds, dropped=0):
+        stage = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'dropped': 0})
+        stage['calls'] += 1
+        stage['seconds'] += seconds
+        stage['dropped'] += dropped
+        if self.callback is not None:
+            self.callback(
+                {'event': 'stage', 'name': name, 'seconds': seconds, 'dropped': dropped}
+            )
+    
+    def add_count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+        if self.callback is not None:
+            self.callback({'event': 'count', 'name': name, 'value': value})
+    
+    def add_word(self, word, seconds):
+        self.words[word] = self.words.get(word, 0.0) + seconds
+        if self.callback is not None:
+            self.callback({'event': 'word', 'name': word, 'seconds': seconds})
+    
+    def merge(self, other):
+        """Adding the records of another profile, or of its to_dict output"""
+        
+        if isinstance(other, Profile):
+            other = other.to_dict()
+        for name, stage in other['stages'].items():
+            mine = self.stages.setdefault(
+                name, {'calls': 0, 'seconds': 0.0, 'dropped': 0}
+            )
+            for key in mine:
+                mine[key] += stage[key]
+        for name, value in other['counters'].items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        for word, seconds in other['words'].items():
+            self.words[word] = self.words.get(word, 0.0) + seconds
+    
+    def to_dict(self):
+        return {
+            'stages': {name: dict(stage) for name, stage in self.stages.items()},
+            'counters': dict(self.counters),
+            'words': dict(self.words),
+        }
+    
+    def to_json(self, path=None):
+        """The records as a JSON string, also written to path if given"""
+        
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, 'w') as file:
+                file.write(text)
+        return text
+
+
+def active():
+    """The active Profile, or None"""
+    
+    return _active.get()
+
+
+def stage(name, function, *args):
+    """Calling function(*args), timed as a stage of the active profile"""
+    
+    profile = _active.get()
+    if profile is None:
+        return function(*args)
+    
+    start = time.perf_counter()
+    result = function(*args)
+    profile.add_stage(name, time.perf_counter() - start)
+    return result
+
+
+def filter_stage(name, function, *args):
+    """Like stage, for a function that returns a subset of its last argument;
+    the number of items it dropped is also recorded"""
+    
+    profile = _active.get()
+    if profile is None:
+        return function(*args)
+    
+    start = time.perf_counter()
+    result = function(*args)
+    profile.add_stage(
+        name, time.perf_counter() - start, dropped=len(args[-1]) - len(result)
+    )
+    return result
+
+
+def word(name, function, *args):
+    """Calling function(*args), timed as the work on the word name"""
+    
+    profile = _active.get()
+    if profile is None:
+        return function(*args)
+    
+    start = time.perf_counter()
+    result = function(*args)
+    profile.add_word(name, time.perf_counter() - start)
+    return result
+
+
+def count(name, value=1):
+    """Adding value to a counter of the active profile"""
+    
+    profile = _active.get()
+    if profile is not None:
+        profile.add_count(name, value)
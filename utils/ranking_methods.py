@@ -1,4 +1,5 @@
-from utils.centroid_it2fs import centroid_it2
+from utils.caching import FOUCache
+from utils.centroid_it2fs import centroid_it2, centroid_it2_batch
 import numpy as np
 
 def centroid_rank(mfs):
@@ -15,6 +16,113 @@ def centroid_rank(mfs):
     return np.argsort(cc)
     
 
+def _flatten(mfs):
+    """(N, 9) array of IT2 FSs given either as [[e, f, g, i, h], [a, b, c, d]]
+    like centroid_it2 or as nine parameters [a, b, c, d, e, f, g, i, h]"""
+    
+    return np.array([[*mf[1], *mf[0]] if len(mf) == 2 else mf for mf in mfs], dtype=float)
+
+
+def _t1_centroids(xmf, height):
+    """Centroids of trapezoidal T1 FSs [a, b, c, d] with the given heights"""
+    
+    a, b, c, d = xmf.T
+    area = c + d - a - b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centroid = (c**2 + d**2 + c * d - a**2 - b**2 - a * b) / (3 * area)
+    return np.where((area > 0) & (height > 0), centroid, (a + d) / 2)
+
+
+def _center_of_centroid(fous, num):
+    return centroid_it2_batch(fous, num=num)[:, -1]
+
+
+def _exact_center_of_centroid(fous, num):
+    return centroid_it2_batch(fous, exact=True)[:, -1]
+
+
+def _mean_of_centroids(fous, num):
+    """Average of the centroids of the UMF and the LMF"""
+    
+    return (_t1_centroids(fous[:, :4], np.ones(len(fous))) + _t1_centroids(fous[:, 4:8], fous[:, 8])) / 2
+
+
+class Ranker:
+    """Ranking IT2 FSs with cached scores.
+    
+    Scores are memoized per IT2 FS (keyed by its nine parameters) with a bounded
+    LRU FOUCache, and each request only computes the distinct IT2 FSs that are not
+    cached yet, all at once through the batch centroid path.
+    
+    Ranking methods:
+    centroid (or wu-mendel): center of the centroid, as in centroid_rank
+    exact-centroid: center of the exact centroid of the trapezoidal FOU
+    mean: average of the centroids of the UMF and the LMF, in closed form
+    """
+    
+    methods = {
+        'centroid': _center_of_centroid,
+        'wu-mendel': _center_of_centroid,
+        'exact-centroid': _exact_center_of_centroid,
+        'mean': _mean_of_centroids,
+    }
+    
+    def __init__(self, maxsize=100_000, num=100):
+        """maxsize: maximum number of cached scores
+        num: number of discretizations for the centroid method
+        """
+        
+        self.num = num
+        self._cache = FOUCache(maxsize)
+    
+    @property
+    def hits(self):
+        return self._cache.hits
+    
+    @property
+    def misses(self):
+        return self._cache.misses
+    
+    def scores(self, mfs, method='centroid'):
+        """Scores of the IT2 FSs used for ranking them
+        
+        mfs: IT2 FSs given as in centroid_rank or by nine parameters each
+        method: name of the ranking method
+        """
+        
+        if method not in self.methods:
+            raise ValueError(f'unknown ranking method {method!r}')
+        fous = _flatten(mfs)
+        if not len(fous):
+            return np.zeros(0)
+        distinct, inverse = np.unique(fous, axis=0, return_inverse=True)
+        
+        keys = [(method, self._cache.key(row)) for row in distinct.tolist()]
+        scores = np.empty(len(distinct))
+        missing = []
+        for i, key in enumerate(keys):
+            score = self._cache.get(key)
+            if score is None:
+                missing.append(i)
+            else:
+                scores[i] = score
+        
+        if missing:
+            scores[missing] = self.methods[method](distinct[missing], self.num)
+            for i in missing:
+                self._cache.put(keys[i], scores[i])
+        
+        return scores[inverse.ravel()]
+    
+    def rank(self, mfs, method='centroid'):
+        """Indices that sort the IT2 FSs in ascending order of their scores"""
+        
+        return np.argsort(self.scores(mfs, method), kind='stable')
+    
+    def clear(self):
+        self._cache.clear()
+
+
 def main():
     
     import pickle
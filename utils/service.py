@@ -0,0 +1,331 @@
+import asyncio
+import itertools
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from eia.config import EIAConfig
+from eia.parallel import encode_word
+from utils.centroid_it2fs import centroid_it2_batch
+from utils.linguistic_weighted_average import lwa_batch
+from utils.ranking_methods import Ranker
+from utils.similarity_measures import jaccard_batch
+import numpy as np
+
+
+def _fou(it2fs):
+    """(9,) array of an IT2 FS given like centroid_it2 or by nine parameters"""
+    
+    if len(it2fs) == 2:
+        it2fs = [*it2fs[1], *it2fs[0]]
+    fou = np.asarray(it2fs, dtype=float)
+    if fou.shape == (8,):
+        fou = np.append(fou, 1)
+    if fou.shape != (9,):
+        raise ValueError(f'an IT2 FS has 8 or 9 parameters, not {fou.size}')
+    return fou
+
+
+def _fous(it2fss):
+    fous = [_fou(fs) for fs in it2fss]
+    return np.array(fous).reshape(-1, 9)
+
+
+# The batch functions run in the worker processes, one call for a whole batch
+
+def _centroids(fous, num):
+    return centroid_it2_batch(np.stack(fous), num=num).tolist()
+
+
+def _rankings(fous, method, num):
+    scores = Ranker.methods[method](np.concatenate(fous), num)
+    bounds = np.cumsum([len(f) for f in fous])[:-1]
+    return [np.argsort(s, kind='stable').tolist() for s in np.split(scores, bounds)]
+
+
+def _jaccards(pairs):
+    a, b = zip(*pairs)
+    return jaccard_batch(np.stack(a), np.stack(b)).tolist()
+
+
+def _lwas(pairs, n):
+    x, w = zip(*pairs)
+    Y, LMFYy, LMFYmu, UMFYy, UMFYmu = lwa_batch(np.stack(x), np.stack(w), n)
+    return [list(values) for values in zip(Y.tolist(), LMFYy.tolist(), LMFYmu.tolist(),
+                                           UMFYy.tolist(), UMFYmu.tolist())]
+
+
+class _Batcher:
+    """Collecting concurrent requests of one kind into a single call
+    
+    The items submitted within delay seconds of the first one, or up to
+    max_batch of them, are passed together to run, a coroutine function that
+    returns a result for each item.
+    """
+    
+    def __init__(self, run, max_batch, delay):
+        self.run = run
+        self.max_batch = max_batch
+        self.delay = delay
+        self._items = []
+        self._futures = []
+        self._timer = None
+        self._tasks = set()
+    
+    def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self._items.append(item)
+        self._futures.append(future)
+        if len(self._items) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.delay, self._flush)
+        return future
+    
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, futures = self._items, self._futures
+        self._items, self._futures = [], []
+        task = asyncio.ensure_future(self._run(items, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, items, futures):
+        try:
+            results = await self.run(items)
+        except Exception as error:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            # futures of requests that timed out are already cancelled
+            for future, result in zip(futures, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class Service:
+    """An asyncio front-end for encoding words and querying IT2 FSs.
+    
+    Operations (coroutines, also reachable by name through call and serve):
+    encode: intervals of a word, and the bounds of the universe of discourse
+        -> preprocessed intervals and word status
+    centroid: IT2 FS -> [c_l, c_r, center]
+    rank: IT2 FSs and a Ranker method -> indices in ascending order
+    jaccard: two IT2 FSs -> Jaccard similarity
+    lwa: IT2 FSs of the subcriteria and weights -> LWA, like lwa
+    
+    IT2 FSs are given like centroid_it2 or by nine parameters. The computations
+    run on a process pool; concurrent centroid, rank, jaccard and lwa requests
+    are micro-batched into a single call of the batch functions.
+    
+    At most max_pending requests are processed at once, and the others wait
+    for a free slot, and each request fails with asyncio.TimeoutError if it is
+    not answered within timeout seconds, waiting included.
+    """
+    
+    operations = ('encode', 'centroid', 'rank', 'jaccard', 'lwa')
+    
+    def __init__(self, workers=None, max_batch=256, delay=0.002, max_pending=1024,
+                 timeout=30, num=100):
+        """workers: number of worker processes, defaults to the number of CPUs;
+            0 runs the computations in threads of the event loop instead
+        max_batch: largest number of requests computed together
+        delay: time in seconds a request waits for others to join its batch
+        max_pending: number of requests processed at once
+        timeout: time limit of a request in seconds, None for no limit
+        num: number of discretizations of the centroids
+        """
+        
+        self.executor = ProcessPoolExecutor(workers) if workers != 0 else None
+        self.max_batch = max_batch
+        self.delay = delay
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.num = num
+        self._slots = asyncio.Semaphore(max_pending)
+        self._batchers = {}
+    
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+    
+    async def _offload(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+    
+    def _batcher(self, key, function, *args):
+        """The batcher of requests computed by function(items, *args)"""
+        
+        batcher = self._batchers.get(key)
+        if batcher is None:
+            async def run(items):
+                return await self._offload(function, items, *args)
+            batcher = self._batchers[key] = _Batcher(run, self.max_batch, self.delay)
+        return batcher
+    
+    async def encode(self, intervals, lower=0, upper=10):
+        """lower, upper: bounds of the universe of discourse of the survey"""
+        
+        config = EIAConfig(lower, upper)
+        intervals, status = await self._offload(encode_word, [tuple(x) for x in intervals], config)
+        return {'intervals': intervals, 'status': status}
+    
+    async def centroid(self, it2fs):
+        return await self._batcher('centroid', _centroids, self.num).submit(_fou(it2fs))
+    
+    async def rank(self, it2fss, method='centroid'):
+        if method not in Ranker.methods:
+            raise ValueError(f'unknown ranking method {method!r}')
+        batcher = self._batcher(('rank', method), _rankings, method, self.num)
+        return await batcher.submit(_fous(it2fss))
+    
+    async def jaccard(self, a, b):
+        return await self._batcher('jaccard', _jaccards).submit((_fou(a), _fou(b)))
+    
+    async def lwa(self, x, w, n=2):
+        x, w = _fous(x), _fous(w)
+        if len(x) != len(w):
+            raise ValueError('x and w must have the same number of IT2 FSs')
+        # only the LWAs of the same number of inputs and alpha-cuts are batched
+        batcher = self._batcher(('lwa', len(x), n), _lwas, n)
+        return await batcher.submit((x, w))
+    
+    def _dispatch(self, op, args):
+        if op not in self.operations:
+            raise ValueError(f'unknown operation {op!r}')
+        return getattr(self, op)(**args)
+    
+    async def call(self, op, **args):
+        """Running an operation by name, within the limits of the service"""
+        
+        async def run():
+            async with self._slots:
+                return await self._dispatch(op, args)
+        
+        return await asyncio.wait_for(run(), self.timeout)
+    
+    async def _respond(self, line, writer):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            result = await asyncio.wait_for(
+                self._dispatch(request.get('op'), request.get('args', {})), self.timeout)
+            response = {'id': request_id, 'result': result}
+        except asyncio.TimeoutError:
+            response = {'id': request_id, 'error': 'TimeoutError: request timed out'}
+        except Exception as error:
+            response = {'id': request_id, 'error': f'{type(error).__name__}: {error}'}
+        finally:
+            self._slots.release()
+        writer.write(json.dumps(response).encode() + b'\n')
+        await writer.drain()
+    
+    async def _connection(self, reader, writer):
+        """Answering the JSON line requests of a connection, in any order
+        
+        The next line is only read once a slot is free, so clients that send
+        too much are slowed down by the transport instead of queuing requests.
+        """
+        
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                await self._slots.acquire()
+                if not line.strip():
+                    self._slots.release()
+                    continue
+                task = asyncio.ensure_future(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+    
+    async def serve(self, path=None, host='127.0.0.1', port=0):
+        """Starting a server of JSON line requests on a Unix socket at path, or
+        on TCP at host and port
+        
+        A request is a line {"id": ..., "op": ..., "args": {...}} and gets a
+        line {"id": ..., "result": ...} or {"id": ..., "error": "..."} back.
+        Returns the asyncio server.
+        """
+        
+        if path is not None:
+            return await asyncio.start_unix_server(self._connection, path)
+        return await asyncio.start_server(self._connection, host, port)
+
+
+class Client:
+    """A client of Service.serve, sending requests concurrently over one connection"""
+    
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count()
+        self._pending = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+    
+    @classmethod
+    async def connect(cls, path=None, host='127.0.0.1', port=None):
+        if path is not None:
+            return cls(*await asyncio.open_unix_connection(path))
+        return cls(*await asyncio.open_connection(host, port))
+    
+    async def _receive(self):
+        try:
+            while line := await self._reader.readline():
+                response = json.loads(line)
+                future = self._pending.pop(response['id'], None)
+                if future is None or future.done():
+                    continue
+                if 'error' in response:
+                    future.set_exception(RuntimeError(response['error']))
+                else:
+                    future.set_result(response['result'])
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('connection closed'))
+    
+    async def call(self, op, **args):
+        """Result of an operation; errors of the service raise RuntimeError"""
+        
+        request_id = next(self._ids)
+        future = self._pending[request_id] = asyncio.get_running_loop().create_future()
+        self._writer.write(json.dumps({'id': request_id, 'op': op, 'args': args}).encode() + b'\n')
+        await self._writer.drain()
+        return await future
+    
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._receiver.cancel()
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Serving IT2 FS operations as JSON lines')
+    parser.add_argument('--unix', help='path of a Unix socket to listen on')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--timeout', type=float, default=30)
+    args = parser.parse_args()
+    
+    async def run():
+        service = Service(workers=args.workers, timeout=args.timeout)
+        server = await service.serve(args.unix, args.host, args.port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            service.close()
+    
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from utils.centroid_it2fs import mg
+from utils.centroid_it2fs import mg_it2
 import numpy as np
 
 def jaccard(a, b):
@@ -10,17 +10,228 @@ def jaccard(a, b):
     n = 200  # number of discretizations
     
     min_x = min(a[0], b[0])  # the range
-    max_x = max(a[3], b[3]);
-    x = list(np.linspace(min_x, max_x, num=n))
+    max_x = max(a[3], b[3])
+    x = np.linspace(min_x, max_x, num=n)
     
-    lower_a = mg(x, a[4:8], [0, a[-1], a[-1], 0])
-    upper_a = mg(x, a[:4])
-    lower_b = mg(x, b[4:8], [0, b[-1], b[-1], 0])
-    upper_b = mg(x, b[:4])
+    lower_a, upper_a = mg_it2(x, a)
+    lower_b, upper_b = mg_it2(x, b)
     
-    s = sum(list(np.minimum(upper_a, upper_b)) + list(np.minimum(lower_a, lower_b))) / \
-        sum(list(np.maximum(upper_a, upper_b)) + list(np.maximum(lower_a, lower_b)))
+    s = (np.minimum(upper_a, upper_b).sum() + np.minimum(lower_a, lower_b).sum()) / \
+        (np.maximum(upper_a, upper_b).sum() + np.maximum(lower_a, lower_b).sum())
     return s
+
+
+def jaccard_batch(a, b, num=200):
+    """computing the Jaccard similarity measure between pairs of IT2 FSs at once.
+    
+    a, b: (N, 9) IT2 FSs each defined by nine parameters; a[k] is compared with b[k].
+    num: number of discretizations of each pair.
+    
+    Each pair is discretized on its own range as in jaccard, so the results
+    are the same as calling jaccard on each pair.
+    """
+    
+    a = np.asarray(a, dtype=float).reshape(-1, 9)
+    b = np.asarray(b, dtype=float).reshape(-1, 9)
+    x = np.linspace(np.minimum(a[:, 0], b[:, 0]), np.maximum(a[:, 3], b[:, 3]), num=num, axis=-1)
+    
+    lower_a, upper_a = mg_it2(x, a)
+    lower_b, upper_b = mg_it2(x, b)
+    
+    s = (np.minimum(upper_a, upper_b).sum(axis=-1) + np.minimum(lower_a, lower_b).sum(axis=-1)) / \
+        (np.maximum(upper_a, upper_b).sum(axis=-1) + np.maximum(lower_a, lower_b).sum(axis=-1))
+    return s
+
+
+def _universe(num, lower, upper, config):
+    """Discretization of the universe of discourse shared by the FOUs"""
+    
+    if config is not None:
+        lower = config.lower if lower is None else lower
+        upper = config.upper if upper is None else upper
+    return np.linspace(0 if lower is None else lower, 10 if upper is None else upper, num=num)
+
+
+def jaccard_matrix(mfs, num=200, lower=None, upper=None, block_size=64, config=None):
+    """computing the Jaccard similarity measure between every pair of IT2 FSs.
+    
+    mfs: (N, 9) IT2 FSs each defined by nine parameters.
+    num: number of discretizations of the universe of discourse.
+    lower, upper: bounds of the universe of discourse, shared by all the FOUs;
+        those of config by default.
+    config: an EIAConfig, or anything with lower and upper attributes; the
+        universe is [0, 10] when neither it nor the bounds are given.
+    block_size: number of rows and columns compared at once. Peak memory is
+        about block_size**2 * num * 16 bytes on top of the N x N result.
+    
+    Every FOU is discretized once on the shared universe, so the values can
+    differ slightly from jaccard, which discretizes the range of each pair.
+    """
+    
+    fous = np.asarray(mfs, dtype=float).reshape(-1, 9)
+    x = _universe(num, lower, upper, config)
+    lmf, umf = mg_it2(x, fous)
+    grades = np.hstack([umf, lmf])
+    totals = grades.sum(axis=-1)
+    
+    n = len(fous)
+    s = np.empty((n, n))
+    for row in range(0, n, block_size):
+        rows = slice(row, row + block_size)
+        # only the blocks on or above the diagonal are computed
+        for col in range(row, n, block_size):
+            cols = slice(col, col + block_size)
+            intersection = np.minimum(grades[rows, None, :], grades[None, cols, :]).sum(axis=-1)
+            # max(u, v) = u + v - min(u, v), so the union comes from the totals
+            union = totals[rows, None] + totals[None, cols] - intersection
+            with np.errstate(divide='ignore', invalid='ignore'):
+                block = intersection / union
+            s[rows, cols] = block
+            s[cols, rows] = block.T
+    return s
+    
+
+class JaccardIndex:
+    """Top-k Jaccard similarity search over a codebook of IT2 FSs.
+    
+    The UMF and LMF of every word are discretized once on a shared universe, as
+    in jaccard_matrix. A query is scored exactly only against the words whose
+    cheap upper bound on the similarity can still make it into the top k.
+    """
+    
+    def __init__(self, words, mfs, num=200, lower=None, upper=None, config=None):
+        """words: names of the words
+        mfs: (N, 9) IT2 FSs of the words each defined by nine parameters
+        num, lower, upper, config: discretization of the universe of
+            discourse, as in jaccard_matrix
+        """
+        
+        self.words = list(words)
+        self.x = _universe(num, lower, upper, config)
+        
+        lmf, umf = mg_it2(self.x, np.asarray(mfs, dtype=float).reshape(-1, 9))
+        self.umf = umf
+        self.lmf = lmf
+        
+        # Supports and totals of the grades, for bounding the similarities
+        self.umf_support = self._support(umf)
+        self.lmf_support = self._support(lmf)
+        self.umf_totals = umf.sum(axis=-1)
+        self.lmf_totals = lmf.sum(axis=-1)
+        self.totals = self.umf_totals + self.lmf_totals
+    
+    @classmethod
+    def from_words_status(cls, words_status, **kwargs):
+        """Building the index from a words status dictionary like the output of
+        process_fuzzy_set_part"""
+        
+        words = list(words_status)
+        mfs = [words_status[w]['MF'][1] + words_status[w]['MF'][0] for w in words]
+        return cls(words, mfs, **kwargs)
+    
+    @classmethod
+    def from_json(cls, path, **kwargs):
+        """Building the index from a words status json file, decoding only
+        the MFs of the words"""
+        
+        from utils.codebook import LazyCodebook
+        
+        codebook = LazyCodebook(path)
+        return cls(codebook.words, codebook.fous(), **kwargs)
+    
+    def __len__(self):
+        return len(self.words)
+    
+    @staticmethod
+    def _support(grades):
+        """Indices of the first and last grid points with a positive grade
+        (first > last for an empty support)"""
+        
+        positive = grades > 0
+        first = np.argmax(positive, axis=-1)
+        last = grades.shape[-1] - 1 - np.argmax(positive[..., ::-1], axis=-1)
+        empty = ~positive.any(axis=-1)
+        return np.where(empty, 1, first), np.where(empty, 0, last)
+    
+    @staticmethod
+    def _cumsum(grades):
+        cumsum = np.zeros(grades.shape[:-1] + (grades.shape[-1] + 1,))
+        np.cumsum(grades, axis=-1, out=cumsum[..., 1:])
+        return cumsum
+    
+    @staticmethod
+    def _overlap_bound(grades, word_support, word_totals):
+        """Upper bound on sum(min(u, v)) of a query T1 FS against every word:
+        the query grades summed over the overlap of the supports, or the total
+        grades of the word if that is smaller"""
+        
+        support = JaccardIndex._support(grades)
+        cumsum = JaccardIndex._cumsum(grades)
+        # an empty overlap has first > last and sums to zero
+        last = np.minimum(word_support[1], support[1]) + 1
+        first = np.minimum(np.maximum(word_support[0], support[0]), last)
+        return np.minimum(cumsum[last] - cumsum[first], word_totals)
+    
+    def bounds(self, fou):
+        """Upper bounds on the Jaccard similarity between fou and every word.
+        
+        The similarity grows with the intersection of the two IT2 FSs, which is
+        bounded by the grades of either of them summed over the overlap of
+        their supports.
+        """
+        
+        lmf, umf = mg_it2(self.x, fou)
+        total = umf.sum() + lmf.sum()
+        intersection = self._overlap_bound(umf, self.umf_support, self.umf_totals) + \
+            self._overlap_bound(lmf, self.lmf_support, self.lmf_totals)
+        union = np.maximum(self.totals + total - intersection, np.finfo(float).tiny)
+        return intersection / union, lmf, umf
+    
+    def query(self, fou, k=1):
+        """Finding the k words most similar to an IT2 FS
+        
+        fou: IT2 FS defined by nine parameters, e.g. the output of lwa
+        k: number of words to return
+        
+        return value: a list of (word, similarity) pairs, most similar first.
+        """
+        
+        n = len(self.words)
+        k = min(k, n)
+        if k <= 0:
+            return []
+        bound, lmf, umf = self.bounds(fou)
+        total = umf.sum() + lmf.sum()
+        
+        # the intersection is zero outside the support of the query
+        first, last = self._support(umf)
+        columns = slice(first, max(first, last + 1))
+        umf = umf[columns]
+        lmf = lmf[columns]
+        
+        def score(candidates):
+            intersection = np.minimum(self.umf[candidates, columns], umf).sum(axis=-1) + \
+                np.minimum(self.lmf[candidates, columns], lmf).sum(axis=-1)
+            union = self.totals[candidates] + total - intersection
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.nan_to_num(intersection / union, nan=0)
+        
+        # Score the most promising words first, then every word whose bound
+        # still reaches the k-th best similarity found so far
+        m = min(n, 2 * k + 16)
+        candidates = np.argpartition(-bound, m - 1)[:m] if m < n else np.arange(n)
+        scores = score(candidates)
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        
+        remaining = bound >= kth
+        remaining[candidates] = False
+        extra = np.flatnonzero(remaining)
+        if extra.size:
+            candidates = np.concatenate([candidates, extra])
+            scores = np.concatenate([scores, score(extra)])
+        
+        best = np.lexsort((candidates, -scores))[:k]
+        return [(self.words[i], float(s)) for i, s in zip(candidates[best], scores[best])]
     
 
 # Testing these functions